@@ -0,0 +1,499 @@
+import os
+import sys
+import io
+import json
+import math
+import time
+import random
+import shutil
+import glob
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+import multiprocessing
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from concurrent.futures import ProcessPoolExecutor
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; results are reported without peak memory there
+    resource = None
+
+import numpy as np
+
+# Benchmarks for every extraction path in model.py, run against synthetic fixtures generated locally.
+# Each case runs in a fresh process so its peak RSS is its own, and the Sarvam AI endpoint is replaced
+# by a local mock server with configurable latency, so audio and video runs cost nothing.
+#
+#   python code/benchmark.py --quick
+#   python code/benchmark.py --output before.json
+#   python code/benchmark.py --compare before.json
+#   python code/benchmark.py --only image,pdf_scanned --ocr-engine pytesseract -o before.json
+#   python code/benchmark.py --check-imports
+
+SAMPLE_RATE = 16000
+# Modules that `import model` must leave to the code paths that use them
+LAZY_MODULES = ("tkinter", "PyPDF2", "tika", "moviepy")
+DEFAULT_IMPORT_BUDGET = 1.0
+DEFAULT_OUTPUT = os.path.join("extracts", "benchmarks", "benchmark_{timestamp}.json")
+
+LOREM_WORDS = ("lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor incididunt ut labore "
+               "et dolore magna aliqua hackathon submission evaluation project judges leaderboard").split()
+
+# Sample text and candidate fonts for the scripts rendered into test images
+SCRIPT_SAMPLES = {
+    "latin": ("The quick brown fox jumps over the lazy dog", ["DejaVuSans.ttf", "*/DejaVuSans.ttf", "*/LiberationSans-Regular.ttf"]),
+    "devanagari": ("हिन्दी भाषा में यह एक परीक्षण वाक्य है", ["*/NotoSansDevanagari-Regular.ttf", "*/Lohit-Devanagari.ttf"]),
+    "bengali": ("এটি বাংলা ভাষায় একটি পরীক্ষামূলক বাক্য", ["*/NotoSansBengali-Regular.ttf", "*/Lohit-Bengali.ttf"]),
+    "tamil": ("இது தமிழ் மொழியில் ஒரு சோதனை வாக்கியம்", ["*/NotoSansTamil-Regular.ttf", "*/Lohit-Tamil.ttf"]),
+}
+FONT_DIRS = ["/usr/share/fonts", "/usr/local/share/fonts", os.path.expanduser("~/.fonts"), "/Library/Fonts", "C:\\Windows\\Fonts"]
+
+# --- Mock Sarvam AI endpoint ---
+
+class MockSarvamHandler(BaseHTTPRequestHandler):
+    """Answers speech-to-text-translate requests with a canned transcript after a simulated delay"""
+
+    def do_POST(self):
+        # Read the whole upload first, like the real service
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        settings = self.server.settings
+        time.sleep(max(0.0, settings["latency"] + random.uniform(-settings["jitter"], settings["jitter"])))
+
+        with self.server.lock:
+            self.server.requests += 1
+        if random.random() < settings["error_rate"]:
+            status, body = 503, {"message": "Service temporarily unavailable (mock)"}
+        else:
+            status, body = 200, {
+                "source_transcript": "यह एक परीक्षण प्रतिलेख है",
+                "transcript": "This is a test transcript",
+                "source_language_code": "hi-IN"
+            }
+
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_mock_sarvam(latency, jitter=0.0, error_rate=0.0):
+    """Start the mock endpoint on a free local port; returns the server, whose URL is server.url"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockSarvamHandler)
+    server.daemon_threads = True
+    server.settings = {"latency": latency, "jitter": jitter, "error_rate": error_rate}
+    server.requests = 0
+    server.lock = threading.Lock()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/speech-to-text-translate"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+# --- Fixtures ---
+
+def random_lines(rng, count, words_per_line=12):
+    return [" ".join(rng.choice(LOREM_WORDS) for _ in range(words_per_line)) for _ in range(count)]
+
+def write_text_file(path, size_bytes, seed=0):
+    """Write roughly size_bytes of UTF-8 text with some non-ASCII characters"""
+    rng = random.Random(seed)
+    block = "\n".join(random_lines(rng, 200)) + "\nनमस्ते দুনিয়া வணக்கம் café\n"
+    block = block.encode('utf-8')
+    with open(path, 'wb') as f:
+        for _ in range(max(1, size_bytes // len(block))):
+            f.write(block)
+
+def pdf_escape(text):
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+def write_text_pdf(path, page_count, lines_per_page=45, seed=0):
+    """Write a minimal PDF with a Helvetica text layer on every page"""
+    rng = random.Random(seed)
+    objects = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    }
+    kids = []
+    for page in range(page_count):
+        page_id, content_id = 4 + 2 * page, 5 + 2 * page
+        lines = [f"Page {page + 1}"] + random_lines(rng, lines_per_page - 1)
+        content = ("BT /F1 10 Tf 14 TL 50 800 Td " + " ".join(f"({pdf_escape(line)}) '" for line in lines) + " ET").encode('latin-1')
+        objects[content_id] = b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream"
+        objects[page_id] = (f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>").encode('latin-1')
+        kids.append(f"{page_id} 0 R")
+    objects[2] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {page_count} >>".encode('latin-1')
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = {}
+    for object_id in sorted(objects):
+        offsets[object_id] = out.tell()
+        out.write(b"%d 0 obj\n" % object_id + objects[object_id] + b"\nendobj\n")
+    xref_offset = out.tell()
+    size = max(objects) + 1
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % size)
+    for object_id in range(1, size):
+        out.write(b"%010d 00000 n \n" % offsets[object_id])
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (size, xref_offset))
+    with open(path, 'wb') as f:
+        f.write(out.getvalue())
+
+def find_font(candidates):
+    """Return the path of the first installed font matching one of the candidate names or patterns"""
+    for candidate in candidates:
+        for font_dir in FONT_DIRS:
+            matches = glob.glob(os.path.join(font_dir, "**", candidate), recursive=True)
+            if matches:
+                return matches[0]
+    return None
+
+def render_text_image(text, font_path, lines=12, width=1700, font_size=36):
+    """Render lines of text in black on white, like a scanned page"""
+    from PIL import Image, ImageDraw, ImageFont
+    font = ImageFont.truetype(font_path, font_size)
+    line_height = int(font_size * 1.6)
+    img = Image.new('RGB', (width, line_height * lines + 100), 'white')
+    draw = ImageDraw.Draw(img)
+    for line in range(lines):
+        draw.text((60, 50 + line * line_height), text, fill='black', font=font)
+    return img
+
+def speech_like_pcm(duration, seed=0):
+    """16 kHz mono int16 audio of syllable-like harmonic bursts separated by pauses"""
+    rng = np.random.default_rng(seed)
+    samples = np.zeros(int(duration * SAMPLE_RATE), dtype=np.float32)
+    position = int(0.5 * SAMPLE_RATE)
+    while position < len(samples):
+        # A "phrase" of 1-6 s of syllables, then a pause of 0.2-1.5 s
+        phrase = min(int(rng.uniform(1, 6) * SAMPLE_RATE), len(samples) - position)
+        t = np.arange(phrase) / SAMPLE_RATE
+        pitch = rng.uniform(100, 220)
+        voice = sum(np.sin(2 * np.pi * pitch * k * t) / k for k in range(1, 6))
+        syllables = 0.5 * (1 + np.sin(2 * np.pi * rng.uniform(3, 5) * t))
+        samples[position:position + phrase] = 0.2 * voice * syllables
+        position += phrase + int(rng.uniform(0.2, 1.5) * SAMPLE_RATE)
+    samples += rng.normal(0, 0.002, len(samples)).astype(np.float32)
+    return (np.clip(samples, -1, 1) * 32767).astype('<i2').tobytes()
+
+def write_wav(path, duration, seed=0):
+    import wave
+    with wave.open(path, 'wb') as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(SAMPLE_RATE)
+        wav_file.writeframes(speech_like_pcm(duration, seed))
+
+def write_mp4(path, wav_path, duration, ffmpeg):
+    """Mux a WAV soundtrack with a small synthetic video track"""
+    command = [
+        ffmpeg, '-v', 'error', '-y',
+        '-f', 'lavfi', '-i', f'testsrc=size=320x240:rate=10:duration={duration}',
+        '-i', wav_path,
+        '-c:v', 'mpeg4', '-q:v', '10', '-c:a', 'aac', '-shortest', path
+    ]
+    subprocess.run(command, check=True)
+
+def build_cases(fixtures_dir, quick=False, only=None):
+    """Generate the fixtures and return the benchmark cases, plus the ones that had to be skipped"""
+    cases = []
+    skipped = []
+    has_tesseract = shutil.which('tesseract') is not None
+
+    def wanted(kind):
+        return not only or kind in only
+
+    def add(kind, label, function, path, media_seconds=None):
+        cases.append({"name": f"{kind}/{label}", "kind": kind, "label": label, "function": function,
+                      "path": path, "input_bytes": os.path.getsize(path), "media_seconds": media_seconds})
+
+    if wanted("text"):
+        for size_mb in ([1, 10] if quick else [1, 20, 100]):
+            path = os.path.join(fixtures_dir, f"text_{size_mb}mb.txt")
+            write_text_file(path, size_mb * 1024 * 1024)
+            add("text", f"{size_mb}mb", "extract_text_from_txt", path)
+
+    if wanted("pdf"):
+        for pages in ([5, 40] if quick else [5, 50, 300]):
+            path = os.path.join(fixtures_dir, f"pdf_{pages}p.pdf")
+            write_text_pdf(path, pages)
+            add("pdf", f"{pages}pages", "extract_text_from_pdf", path)
+
+    if wanted("pdf_scanned") or wanted("image"):
+        fonts = {script: find_font(candidates) for script, (_, candidates) in SCRIPT_SAMPLES.items()}
+        for script, font_path in fonts.items():
+            if not font_path:
+                skipped.append({"name": f"image/{script}", "reason": "no font for this script is installed"})
+        if not has_tesseract:
+            skipped.append({"name": "image, pdf_scanned", "reason": "tesseract is not installed"})
+        else:
+            if wanted("image"):
+                for script, font_path in fonts.items():
+                    if font_path:
+                        path = os.path.join(fixtures_dir, f"image_{script}.png")
+                        render_text_image(SCRIPT_SAMPLES[script][0], font_path).save(path)
+                        add("image", script, "extract_text_from_image", path)
+            if wanted("pdf_scanned") and fonts["latin"]:
+                for pages in ([2] if quick else [2, 10]):
+                    path = os.path.join(fixtures_dir, f"pdf_scanned_{pages}p.pdf")
+                    page_images = [render_text_image(f"Scanned page {page + 1} " + SCRIPT_SAMPLES["latin"][0], fonts["latin"], lines=30)
+                                   for page in range(pages)]
+                    page_images[0].save(path, save_all=True, append_images=page_images[1:], resolution=150)
+                    add("pdf_scanned", f"{pages}pages", "extract_text_from_pdf", path)
+
+    durations = [20, 90] if quick else [20, 120, 600]
+    if wanted("audio") or wanted("video"):
+        for duration in durations:
+            wav_path = os.path.join(fixtures_dir, f"audio_{duration}s.wav")
+            write_wav(wav_path, duration, seed=duration)
+            if wanted("audio"):
+                add("audio", f"{duration}s", "extract_text_from_audio", wav_path, media_seconds=duration)
+
+    if wanted("video"):
+        import model
+        ffmpeg = model.get_ffmpeg_binary()
+        for duration in durations[:2] if quick else durations:
+            path = os.path.join(fixtures_dir, f"video_{duration}s.mp4")
+            write_mp4(path, os.path.join(fixtures_dir, f"audio_{duration}s.wav"), duration, ffmpeg)
+            add("video", f"{duration}s", "extract_text_from_video", path, media_seconds=duration)
+
+    return cases, skipped
+
+# --- Measurement ---
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+def peak_rss_mb():
+    """Peak resident memory of this process and of its finished children (PDF workers), in MB"""
+    if resource is None:
+        return None
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+def run_case(case, work_dir, repeats, warmup, verbose=False):
+    """Run one case in the current (fresh) process and return its measurements"""
+    # model creates its output folders relative to the working directory
+    os.chdir(work_dir)
+    if not verbose:
+        # Keep the extractors' progress messages out of the report
+        sys.stdout = open(os.devnull, 'w')
+    import model
+    extractor = getattr(model, case["function"])
+
+    cold_times = []
+    for _ in range(warmup):
+        start = time.perf_counter()
+        extractor(case["path"])
+        cold_times.append(time.perf_counter() - start)
+
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = extractor(case["path"])
+        times.append(time.perf_counter() - start)
+
+    median = percentile(times, 0.5)
+    measurement = {
+        "name": case["name"],
+        "kind": case["kind"],
+        "label": case["label"],
+        "function": case["function"],
+        "input_bytes": case["input_bytes"],
+        "repeats": repeats,
+        "cold_s": round(cold_times[0], 4) if cold_times else None,
+        "mean_s": round(sum(times) / len(times), 4),
+        "p50_s": round(median, 4),
+        "p95_s": round(percentile(times, 0.95), 4),
+        "files_per_s": round(1 / median, 3) if median else None,
+        "mb_per_s": round(case["input_bytes"] / (1024 * 1024) / median, 3) if median else None,
+        "peak_rss_mb": peak_rss_mb(),
+        "method": result["method"],
+        "output_chars": len(result["text"]),
+    }
+    if case["media_seconds"]:
+        # Seconds of audio transcribed per second of wall time
+        measurement["realtime_factor"] = round(case["media_seconds"] / median, 2) if median else None
+    return measurement
+
+def measure_import_time(repeats):
+    """Time a cold `import model` in a fresh interpreter"""
+    code_dir = os.path.dirname(os.path.abspath(__file__))
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'import model'], cwd=tempfile.gettempdir(), check=True,
+                       env=dict(os.environ, PYTHONPATH=code_dir), stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return {
+        "name": "import/model", "kind": "import", "label": "model", "function": None, "input_bytes": 0,
+        "repeats": repeats, "cold_s": None, "mean_s": round(sum(times) / len(times), 4),
+        "p50_s": round(percentile(times, 0.5), 4), "p95_s": round(percentile(times, 0.95), 4),
+        "files_per_s": None, "mb_per_s": None, "peak_rss_mb": None, "method": None, "output_chars": 0,
+    }
+
+def check_imports(budget):
+    """Check that `import model` in a fresh interpreter stays under `budget` seconds and loads none of
+    LAZY_MODULES; returns the exit status"""
+    code_dir = os.path.dirname(os.path.abspath(__file__))
+    probe = ("import sys, time, json\n"
+             "start = time.perf_counter()\n"
+             "import model\n"
+             "elapsed = time.perf_counter() - start\n"
+             f"loaded = [name for name in {LAZY_MODULES!r} if name in sys.modules]\n"
+             "print(json.dumps({'elapsed': elapsed, 'loaded': loaded}))\n")
+    output = subprocess.run([sys.executable, '-c', probe], cwd=tempfile.gettempdir(), check=True,
+                            env=dict(os.environ, PYTHONPATH=code_dir), capture_output=True, text=True).stdout
+    report = json.loads(output.strip().splitlines()[-1])
+
+    failures = []
+    if report["loaded"]:
+        failures.append(f"import model loaded {', '.join(report['loaded'])}")
+    if report["elapsed"] > budget:
+        failures.append(f"import model took {report['elapsed']:.3f}s, over the {budget:.3f}s budget")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print(f"OK: import model took {report['elapsed']:.3f}s (budget {budget:.3f}s), "
+              f"none of {', '.join(LAZY_MODULES)} loaded")
+    return 1 if failures else 0
+
+def compare_results(results, baseline_path, tolerance):
+    """Print p50 changes against an earlier results file; returns the names of cases that got slower"""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {result["name"]: result for result in json.load(f)["results"]}
+
+    regressions = []
+    print(f"\nCompared with {baseline_path} (regression threshold: +{tolerance:.0%} p50):")
+    for result in results:
+        previous = baseline.get(result["name"])
+        if not previous or not previous.get("p50_s"):
+            print(f"  {result['name']:<24} new")
+            continue
+        change = result["p50_s"] / previous["p50_s"] - 1
+        flag = ""
+        if change > tolerance:
+            flag = "  REGRESSION"
+            regressions.append(result["name"])
+        print(f"  {result['name']:<24} {previous['p50_s']:>9.3f}s -> {result['p50_s']:>9.3f}s ({change:+.1%}){flag}")
+    return regressions
+
+def print_results(results):
+    print(f"\n{'case':<24} {'p50 s':>9} {'p95 s':>9} {'cold s':>9} {'files/s':>9} {'MB/s':>9} {'peak MB':>9}  method")
+    for result in results:
+        def column(key):
+            value = result.get(key)
+            return f"{value:>9.3f}" if isinstance(value, (int, float)) else f"{'-':>9}"
+        print(f"{result['name']:<24} {column('p50_s')} {column('p95_s')} {column('cold_s')} {column('files_per_s')} "
+              f"{column('mb_per_s')} {column('peak_rss_mb')}  {result.get('method') or ''}")
+
+def build_arg_parser():
+    arg_parser = argparse.ArgumentParser(description="Benchmark the text extraction paths on synthetic fixtures")
+    arg_parser.add_argument("--quick", action="store_true", help="Use fewer and smaller fixtures")
+    arg_parser.add_argument("--only", help="Comma-separated kinds to run: import,text,pdf,pdf_scanned,image,audio,video")
+    arg_parser.add_argument("-n", "--repeat", type=int, default=5, help="Measured runs per case (default: 5)")
+    arg_parser.add_argument("--warmup", type=int, default=1, help="Unmeasured runs per case first; the first one is reported as cold_s")
+    arg_parser.add_argument("--api-latency", type=float, default=0.5, help="Mock Sarvam AI response time in seconds (default: 0.5)")
+    arg_parser.add_argument("--api-jitter", type=float, default=0.1, help="Random +/- variation of the mock latency in seconds")
+    arg_parser.add_argument("--api-error-rate", type=float, default=0.0, help="Fraction of mock requests answered with 503")
+    arg_parser.add_argument("--api-rps", type=float, default=None,
+                            help="SARVAM_REQUESTS_PER_SECOND for the run (default: the configured value)")
+    arg_parser.add_argument("--ocr-engine", choices=["auto", "tesserocr", "pytesseract"],
+                            help="OCR_ENGINE for the run, to compare images/second between engines")
+    arg_parser.add_argument("--fixtures", help="Keep the generated fixtures in this directory instead of a temporary one")
+    arg_parser.add_argument("-o", "--output", default=None, help=f"Results file (default: {DEFAULT_OUTPUT})")
+    arg_parser.add_argument("-v", "--verbose", action="store_true", help="Show the extractors' own output")
+    arg_parser.add_argument("--compare", metavar="FILE", help="Earlier results file to compare against")
+    arg_parser.add_argument("--tolerance", type=float, default=0.2, help="p50 slowdown counted as a regression (default: 0.2)")
+    arg_parser.add_argument("--check-imports", action="store_true",
+                            help="Only check that importing model is fast and loads no heavy modules; exits 1 if not")
+    arg_parser.add_argument("--import-budget", type=float, default=DEFAULT_IMPORT_BUDGET,
+                            help=f"Seconds allowed for import model with --check-imports (default: {DEFAULT_IMPORT_BUDGET})")
+    return arg_parser
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+    if args.check_imports:
+        return check_imports(args.import_budget)
+    only = set(args.only.split(",")) if args.only else None
+    output_path = args.output or DEFAULT_OUTPUT.format(timestamp=datetime.now().strftime("%Y%m%d_%H%M%S"))
+
+    mock_server = start_mock_sarvam(args.api_latency, args.api_jitter, args.api_error_rate)
+    # Case processes read these when they import model
+    os.environ["SARVAM_API_URL"] = mock_server.url
+    os.environ["SARVAM_API_KEY"] = "benchmark"
+    os.environ["EXTRACTION_TRACE_FILE"] = ""
+    if args.api_rps:
+        os.environ["SARVAM_REQUESTS_PER_SECOND"] = str(args.api_rps)
+    if args.ocr_engine:
+        os.environ["OCR_ENGINE"] = args.ocr_engine
+
+    fixtures_dir = args.fixtures or tempfile.mkdtemp(prefix="extraction_benchmark_")
+    os.makedirs(fixtures_dir, exist_ok=True)
+    work_dir = os.path.join(fixtures_dir, "work")
+    os.makedirs(work_dir, exist_ok=True)
+
+    results = []
+    try:
+        if not only or "import" in only:
+            print("Measuring import time...")
+            results.append(measure_import_time(max(args.repeat, 3)))
+
+        print(f"Generating fixtures in {fixtures_dir}...")
+        cases, skipped = build_cases(fixtures_dir, quick=args.quick, only=only)
+        for skip in skipped:
+            print(f"Skipping {skip['name']}: {skip['reason']}")
+
+        # A fresh spawned process per case, so peak RSS and lazily loaded backends are measured per case
+        spawn_context = multiprocessing.get_context("spawn")
+        for number, case in enumerate(cases, start=1):
+            print(f"[{number}/{len(cases)}] {case['name']} ({case['input_bytes'] / (1024 * 1024):.1f} MB)...", flush=True)
+            with ProcessPoolExecutor(max_workers=1, mp_context=spawn_context) as executor:
+                try:
+                    results.append(executor.submit(run_case, case, work_dir, args.repeat, args.warmup, args.verbose).result())
+                except Exception as e:
+                    print(f"  failed: {e}")
+                    skipped.append({"name": case["name"], "reason": f"failed: {e}"})
+    finally:
+        mock_server.shutdown()
+        if not args.fixtures:
+            shutil.rmtree(fixtures_dir, ignore_errors=True)
+
+    print_results(results)
+    report = {
+        "timestamp": datetime.now().isoformat(timespec='seconds'),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "settings": {
+            "quick": args.quick, "repeat": args.repeat, "warmup": args.warmup,
+            "api_latency": args.api_latency, "api_jitter": args.api_jitter,
+            "api_error_rate": args.api_error_rate, "api_rps": args.api_rps, "ocr_engine": args.ocr_engine,
+            "mock_requests": mock_server.requests,
+        },
+        "results": results,
+        "skipped": skipped,
+    }
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\nResults saved to {output_path}")
+
+    if args.compare:
+        regressions = compare_results(results, args.compare, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} case(s) slower than the baseline: {', '.join(regressions)}")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
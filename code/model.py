@@ -1,23 +1,52 @@
 import os
-import tkinter as tk
-from tkinter import filedialog, messagebox, scrolledtext
 from datetime import datetime
 import mimetypes
 import pathlib
-import PyPDF2
-import pytesseract
-from PIL import Image
 import io
-import tika
-from tika import parser
-import requests
 import json
 import tempfile
-from moviepy.editor import VideoFileClip, AudioFileClip
 from dotenv import load_dotenv
 import time
 import traceback
 import subprocess
+import sys
+import glob
+import importlib
+import importlib.util
+import bisect
+import argparse
+import codecs
+import collections
+import threading
+import queue
+import wave
+import hashlib
+import functools
+import random
+import select
+import shutil
+import signal
+import socketserver
+import struct
+import urllib.parse
+import zipfile
+import tarfile
+import zlib
+import contextlib
+import contextvars
+import cProfile
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; spans are recorded without peak memory there
+    resource = None
+try:
+    import fcntl
+except ImportError:
+    # Not available on Windows; there the job file is only protected against threads of the same process
+    fcntl = None
 
 # Load environment variables from .env file if it exists
 try:
@@ -26,32 +55,724 @@ try:
 except Exception as e:
     print(f"Note: Could not load .env file. Using system environment variables. ({e})")
 
-# Initialize tika
-tika.initVM()
+# Extraction backends (tkinter, PyPDF2, pytesseract, PIL, Tika, requests, moviepy) are imported by the
+# functions that use them, so starting a worker or extracting a text file does not pay for all of them
 
 # Sarvam AI API settings
 SARVAM_API_KEY = os.environ.get('SARVAM_API_KEY', '')
-SARVAM_SPEECH_TO_TEXT_TRANSLATE_URL = "https://api.sarvam.ai/speech-to-text-translate" # This handles both transcription and translation
+# This handles both transcription and translation; SARVAM_API_URL can point it at a local mock server
+SARVAM_SPEECH_TO_TEXT_TRANSLATE_URL = os.environ.get('SARVAM_API_URL', "https://api.sarvam.ai/speech-to-text-translate")
 # The batch API is not directly accessible via REST API and requires using a notebook
 SARVAM_BATCH_NOTEBOOK_URL = "https://github.com/sarvamai/sarvam-ai-cookbook/tree/main/notebooks/stt-translate/stt-translate-batch-api"
+SARVAM_MODEL = os.environ.get('SARVAM_MODEL', 'saaras:v2')
+# Long audio is sent as concurrent segments of up to 30 seconds, limited by a token bucket shared by all threads
+SARVAM_MAX_CONCURRENT_REQUESTS = int(os.environ.get('SARVAM_MAX_CONCURRENT_REQUESTS', '4'))
+SARVAM_REQUESTS_PER_SECOND = float(os.environ.get('SARVAM_REQUESTS_PER_SECOND', '1'))
+SARVAM_REQUEST_BURST = int(os.environ.get('SARVAM_REQUEST_BURST', '4'))
+# Every API call has a timeout and is retried with jittered exponential backoff on 429/5xx and network errors
+SARVAM_CONNECT_TIMEOUT = float(os.environ.get('SARVAM_CONNECT_TIMEOUT', '10'))
+SARVAM_READ_TIMEOUT = float(os.environ.get('SARVAM_READ_TIMEOUT', '120'))
+SARVAM_MAX_RETRIES = int(os.environ.get('SARVAM_MAX_RETRIES', '4'))
+SARVAM_BACKOFF_BASE = float(os.environ.get('SARVAM_BACKOFF_BASE', '1'))
+SARVAM_BACKOFF_MAX = float(os.environ.get('SARVAM_BACKOFF_MAX', '30'))
+
+# Speech-to-text backend: "sarvam" (the API above), "local" (an offline model on the CPU) or "auto",
+# which uses the API unless the local model is expected to finish a file sooner
+TRANSCRIPTION_BACKEND = os.environ.get('TRANSCRIPTION_BACKEND', 'auto')
+# The local backend runs a quantized Whisper model with faster-whisper (optional), decoding
+# LOCAL_ASR_BATCH_SIZE segments per inference call with LOCAL_ASR_WORKERS calls at once
+LOCAL_ASR_MODEL = os.environ.get('LOCAL_ASR_MODEL', 'small')
+LOCAL_ASR_COMPUTE_TYPE = os.environ.get('LOCAL_ASR_COMPUTE_TYPE', 'int8')
+LOCAL_ASR_BATCH_SIZE = int(os.environ.get('LOCAL_ASR_BATCH_SIZE', '8'))
+LOCAL_ASR_WORKERS = int(os.environ.get('LOCAL_ASR_WORKERS', '2'))
+# Seconds the local model needs per second of audio on this machine, to compare it with the API's queue
+LOCAL_ASR_REALTIME_FACTOR = float(os.environ.get('LOCAL_ASR_REALTIME_FACTOR', '0.3'))
+
+# Long audio is decoded once to 16 kHz mono 16-bit PCM and cut into segments the real-time API accepts
+SPEECH_SAMPLE_RATE = 16000
+SEGMENT_LENGTH = 30.0
+# "vad" drops silence and packs speech into chunks that end in pauses; "fixed" cuts every SEGMENT_LENGTH seconds
+AUDIO_SEGMENTATION = os.environ.get('AUDIO_SEGMENTATION', 'vad')
+# Voice activity detection: frames more than VAD_THRESHOLD_DB above the window's noise floor (or within
+# VAD_PEAK_RANGE_DB of its loudest frame, and above VAD_MIN_SPEECH_DBFS) are speech; pauses shorter than VAD_MIN_PAUSE stay inside the speech around them,
+# voiced blips shorter than VAD_MIN_SPEECH are ignored and VAD_PADDING seconds are kept around speech
+VAD_FRAME_LENGTH = 0.03
+VAD_MAX_SEGMENT_LENGTH = float(os.environ.get('VAD_MAX_SEGMENT_LENGTH', '29.5'))
+VAD_THRESHOLD_DB = float(os.environ.get('VAD_THRESHOLD_DB', '12'))
+VAD_PEAK_RANGE_DB = 25.0
+VAD_MIN_SPEECH_DBFS = -55.0
+VAD_MIN_PAUSE = 0.3
+VAD_MIN_SPEECH = 0.25
+VAD_PADDING = 0.2
+
+# Video slide OCR: frames are sampled VIDEO_FRAME_RATE times per second and compared by perceptual hash.
+# A frame is OCR'd when the next sample shows the same picture (the scene has settled) and its hash differs
+# in more than VIDEO_DUPLICATE_DISTANCE of the bits set in either from every slide already OCR'd
+VIDEO_SLIDE_OCR = os.environ.get('VIDEO_SLIDE_OCR', '1') == '1'
+VIDEO_FRAME_RATE = float(os.environ.get('VIDEO_FRAME_RATE', '1'))
+VIDEO_FRAME_MAX_WIDTH = 1920
+VIDEO_HASH_SIZE = 32
+VIDEO_DUPLICATE_DISTANCE = float(os.environ.get('VIDEO_DUPLICATE_DISTANCE', '0.1'))
+VIDEO_MAX_SLIDES = int(os.environ.get('VIDEO_MAX_SLIDES', '200'))
+
+# Tesseract settings: all installed Indic language packs plus English, treating the image as one block of text
+TESSERACT_LANGUAGES = 'eng+ben+hin+tam+tel+kan+mal'
+TESSERACT_PSM = 6
+# "script" detects the script once with Tesseract OSD and loads only the matching language packs;
+# "multilingual" loads every pack above and falls back to Tika and an English-only pass
+TESSERACT_OCR_MODE = os.environ.get('TESSERACT_OCR_MODE', 'script')
+# "auto" runs OCR on long-lived in-process tesserocr handles when tesserocr is installed, otherwise
+# pytesseract, which starts a tesseract process per call; "tesserocr" and "pytesseract" force one of them
+OCR_ENGINE = os.environ.get('OCR_ENGINE', 'auto')
+# Tesseract OSD script names mapped to our language packs
+SCRIPT_LANGUAGES = {
+    'Latin': 'eng',
+    'Devanagari': 'hin',
+    'Bengali': 'ben',
+    'Tamil': 'tam',
+    'Telugu': 'tel',
+    'Kannada': 'kan',
+    'Malayalam': 'mal',
+}
+
+# Images are preprocessed before OCR: orientation fix, grayscale, binarization and downscaling.
+# Images taller than two tiles are split into horizontal strips that are OCR'd in parallel.
+OCR_TARGET_DPI = 300
+OCR_MAX_DIMENSION = int(os.environ.get('OCR_MAX_DIMENSION', '5000'))
+OCR_BINARIZE = os.environ.get('OCR_BINARIZE', '1') == '1'
+OCR_TILE_HEIGHT = int(os.environ.get('OCR_TILE_HEIGHT', '1200'))
+OCR_TILE_WORKERS = int(os.environ.get('OCR_TILE_WORKERS', str(os.cpu_count() or 1)))
+
+# PDF pages are extracted in parallel; pages without a text layer are rendered and OCR'd
+PDF_PAGE_WORKERS = int(os.environ.get('PDF_PAGE_WORKERS', str(os.cpu_count() or 1)))
+PDF_OCR_DPI = 300
+# Smaller documents are extracted in-process, where starting worker processes would cost more than it saves
+PDF_PARALLEL_MIN_PAGES = 8
+
+# Text files are decoded incrementally in chunks; only the first TEXT_MAX_MB are read (0 reads everything)
+TEXT_CHUNK_BYTES = 1024 * 1024
+TEXT_MAX_BYTES = int(float(os.environ.get('TEXT_MAX_MB', '200')) * 1024 * 1024)
+
+# ZIP and TAR archives are read member by member, and each member is only copied to disk while it is
+# extracted. Reading stops after ARCHIVE_MAX_MEMBERS files or ARCHIVE_MAX_MB of uncompressed data,
+# so a zip bomb cannot fill the disk
+ARCHIVE_MAX_MEMBERS = int(os.environ.get('ARCHIVE_MAX_MEMBERS', '500'))
+ARCHIVE_MAX_BYTES = int(float(os.environ.get('ARCHIVE_MAX_MB', '2048')) * 1024 * 1024)
+ARCHIVE_MEMBER_WORKERS = int(os.environ.get('ARCHIVE_MEMBER_WORKERS', str(os.cpu_count() or 1)))
+ARCHIVE_EXTENSIONS = ('.zip', '.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+# Files that operating systems add to archives, rather than part of the submission
+ARCHIVE_IGNORED_NAMES = ('.DS_Store', 'Thumbs.db', 'desktop.ini')
 
 # Make sure extracts directory exists
 EXTRACTS_DIR = "extracts"
 BATCH_JOBS_FILE = os.path.join(EXTRACTS_DIR, "batch_jobs.json")
 os.makedirs(EXTRACTS_DIR, exist_ok=True)
 
+# Service mode keeps a pool of warm worker processes behind a local HTTP server
+SERVICE_HOST = os.environ.get('EXTRACTION_SERVICE_HOST', '127.0.0.1')
+SERVICE_PORT = int(os.environ.get('EXTRACTION_SERVICE_PORT', '8765'))
+# Requests beyond the busy workers plus this many queued ones are turned away with 503
+SERVICE_QUEUE_SIZE = int(os.environ.get('EXTRACTION_SERVICE_QUEUE_SIZE', '16'))
+SERVICE_MAX_UPLOAD_BYTES = int(float(os.environ.get('EXTRACTION_SERVICE_MAX_UPLOAD_MB', '500')) * 1024 * 1024)
+
+def _default_memory_mb():
+    """Three quarters of the physical memory in MB, or 4 GB where it cannot be read"""
+    try:
+        return os.sysconf('SC_PHYS_PAGES') * os.sysconf('SC_PAGE_SIZE') * 0.75 / (1024 * 1024)
+    except (AttributeError, ValueError, OSError):
+        return 4096
+
+# Bulk extraction runs files from one queue per file type. Each queue starts at most `workers` files at
+# once and only while the estimated memory of its running files stays within `memory_mb`; all of them
+# together stay within SCHEDULER_MEMORY_MB. SCHEDULER_QUEUES (JSON) overrides the limits of any type.
+# "sjf" starts the cheapest waiting file first, counting SCHEDULER_AGING seconds of cost off per second
+# waited so files that arrive later cannot starve a long one; "fifo" keeps submission order
+SCHEDULER_POLICY = os.environ.get('SCHEDULER_POLICY', 'sjf')
+SCHEDULER_AGING = float(os.environ.get('SCHEDULER_AGING', '1'))
+SCHEDULER_MEMORY_MB = float(os.environ.get('SCHEDULER_MEMORY_MB', '0')) or _default_memory_mb()
+
+def _scheduler_queues():
+    """Per-type queue limits: the defaults below, updated from the SCHEDULER_QUEUES environment variable"""
+    queues = {
+        "Text": {"memory_mb": 1024},
+        "PDF": {"memory_mb": 4096},
+        "Image": {"memory_mb": 4096},
+        # Audio and video mostly wait on ffmpeg and the speech-to-text API
+        "Audio": {"workers": 2, "memory_mb": 1024},
+        "Video": {"workers": 2, "memory_mb": 2048},
+        "Archive": {"workers": 1},
+        # Unknown files are rejected straight away
+        "Unknown": {"workers": 1},
+    }
+    for file_type, limits in json.loads(os.environ.get('SCHEDULER_QUEUES', '{}')).items():
+        queues.setdefault(file_type, {}).update(limits)
+    return queues
+
+SCHEDULER_QUEUES = _scheduler_queues()
+
+# Watch mode extracts files as they appear in WATCH_DIR (by default the server's upload folder), once each
+WATCH_DIR = os.environ.get('WATCH_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "server", "public", "temp"))
+WATCH_STATE_FILE = os.path.join(EXTRACTS_DIR, "watch_processed.jsonl")
+WATCH_POLL_INTERVAL = float(os.environ.get('WATCH_POLL_INTERVAL', '2'))
+# A file is picked up once its size and modification time have not changed for this long
+WATCH_SETTLE_SECONDS = float(os.environ.get('WATCH_SETTLE_SECONDS', '2'))
+WATCH_IGNORED_SUFFIXES = ('.part', '.partial', '.tmp', '.crdownload', '.swp')
+
+# Extraction results are cached by file content; least recently used entries are evicted above the size limit
+EXTRACTION_CACHE_DIR = os.path.join(EXTRACTS_DIR, "cache")
+EXTRACTION_CACHE_MAX_BYTES = int(os.environ.get('EXTRACTION_CACHE_MAX_MB', '512')) * 1024 * 1024
+# Bump when extractor output changes so stale cache entries are ignored
+EXTRACTION_CACHE_VERSION = 1
+
+# Timing spans for every extraction stage are appended as JSON lines to EXTRACTION_TRACE_FILE when it is set.
+# EXTRACTION_PROFILER=cprofile or pyinstrument also profiles each extracted file into PROFILES_DIR.
+EXTRACTION_TRACE_FILE = os.environ.get('EXTRACTION_TRACE_FILE', '')
+EXTRACTION_PROFILER = os.environ.get('EXTRACTION_PROFILER', '')
+PROFILES_DIR = os.path.join(EXTRACTS_DIR, "profiles")
+
+_trace_lock = threading.Lock()
+_current_span = contextvars.ContextVar('current_span', default=None)
+
+class Span:
+    """A timed extraction stage; set `bytes` or add to `fields` inside the `with span(...)` block"""
+    
+    def __init__(self, name, fields, parent=None):
+        self.name = name
+        self.bytes = fields.pop('bytes', None)
+        self.file = fields.pop('file', None) or (parent.file if parent else None)
+        self.fields = fields
+        self.parent = parent
+
+def _peak_memory():
+    """Peak resident memory in KB of this process and of its finished children (ffmpeg, tesseract)"""
+    if resource is None:
+        return {}
+    return {
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "children_peak_rss_kb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    }
+
+def write_trace_record(record):
+    """Append one JSON line to the trace file"""
+    line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+    with _trace_lock:
+        with open(EXTRACTION_TRACE_FILE, 'a', encoding='utf-8') as f:
+            f.write(line)
+
+@contextlib.contextmanager
+def span(name, **fields):
+    """Record wall time, CPU time, bytes processed and peak memory of an extraction stage
+    
+    Spans nest: each record names its parent span and inherits the file being extracted.
+    Nothing is measured unless EXTRACTION_TRACE_FILE is set.
+    """
+    parent = _current_span.get()
+    current = Span(name, fields, parent)
+    if not EXTRACTION_TRACE_FILE:
+        yield current
+        return
+    
+    token = _current_span.set(current)
+    started_at = time.time()
+    wall_start = time.perf_counter()
+    cpu_start = time.thread_time()
+    children_start = os.times()
+    error = None
+    try:
+        yield current
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        _current_span.reset(token)
+        children_end = os.times()
+        record = {
+            "span": name,
+            "file": current.file,
+            "parent": parent.name if parent else None,
+            "start": started_at,
+            "wall_s": round(time.perf_counter() - wall_start, 6),
+            "cpu_s": round(time.thread_time() - cpu_start, 6),
+            # CPU used by subprocesses (ffmpeg, tesseract) that finished during the span
+            "children_cpu_s": round((children_end.children_user + children_end.children_system)
+                                    - (children_start.children_user + children_start.children_system), 6),
+            "bytes": current.bytes,
+            "pid": os.getpid(),
+            "thread": threading.current_thread().name
+        }
+        record.update(_peak_memory())
+        record.update(current.fields)
+        if error:
+            record["error"] = error
+        try:
+            write_trace_record(record)
+        except Exception as e:
+            print(f"Warning: Could not write trace record: {e}")
+
+def submit_in_context(executor, fn, *args):
+    """Submit work to a thread pool so that it runs inside the caller's current span"""
+    return executor.submit(contextvars.copy_context().run, fn, *args)
+
+@contextlib.contextmanager
+def profile_extraction(file_path):
+    """Profile one file's extraction with cProfile or pyinstrument, according to EXTRACTION_PROFILER"""
+    if EXTRACTION_PROFILER not in ('cprofile', 'pyinstrument'):
+        yield
+        return
+    
+    os.makedirs(PROFILES_DIR, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    profile_name = f"{os.path.basename(file_path)}_{timestamp}_{os.getpid()}"
+    
+    if EXTRACTION_PROFILER == 'pyinstrument':
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            print("Warning: pyinstrument is not installed; run 'pip install pyinstrument' to use it.")
+            yield
+            return
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            profile_path = os.path.join(PROFILES_DIR, f"{profile_name}.html")
+            with open(profile_path, 'w', encoding='utf-8') as f:
+                f.write(profiler.output_html())
+            print(f"Profile saved to: {profile_path}")
+    else:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            profile_path = os.path.join(PROFILES_DIR, f"{profile_name}.prof")
+            profiler.dump_stats(profile_path)
+            print(f"Profile saved to: {profile_path}")
+
+class TokenBucket:
+    """Thread-safe token bucket rate limiter: allows `rate` calls per second with bursts of up to `capacity`"""
+    
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until a token is available and consume it"""
+        if self.rate <= 0:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+                self.last_refill = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait_time = (1 - self.tokens) / self.rate
+            sleep_unless_cancelled(wait_time)
+
+# Shared by every request to the Sarvam AI API made from this process; worker pools split the rate between their processes
+sarvam_rate_limiter = TokenBucket(SARVAM_REQUESTS_PER_SECOND, SARVAM_REQUEST_BURST)
+
+class SarvamClient:
+    """Pooled, keep-alive HTTP client for the Sarvam AI speech-to-text-translate endpoint
+    
+    Requests time out, are retried with jittered exponential backoff on 429/5xx responses and network
+    errors, and the latency of every attempt is recorded for stats().
+    """
+    
+    RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+    
+    def __init__(self, url=None, connect_timeout=None, read_timeout=None, max_retries=None,
+                 backoff_base=None, backoff_max=None, pool_size=None):
+        self.url = url or SARVAM_SPEECH_TO_TEXT_TRANSLATE_URL
+        self.timeout = (
+            connect_timeout if connect_timeout is not None else SARVAM_CONNECT_TIMEOUT,
+            read_timeout if read_timeout is not None else SARVAM_READ_TIMEOUT
+        )
+        self.max_retries = max_retries if max_retries is not None else SARVAM_MAX_RETRIES
+        self.backoff_base = backoff_base if backoff_base is not None else SARVAM_BACKOFF_BASE
+        self.backoff_max = backoff_max if backoff_max is not None else SARVAM_BACKOFF_MAX
+        
+        import requests
+        from requests.adapters import HTTPAdapter
+        self.session = requests.Session()
+        # Retries are handled here rather than by urllib3 so they can honour Retry-After and be counted
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size or SARVAM_MAX_CONCURRENT_REQUESTS, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
+        self.lock = threading.Lock()
+        self.latencies = []
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+    
+    def _backoff_delay(self, attempt, response):
+        """Seconds to wait before the next attempt: Retry-After if the server sent one, else full jitter"""
+        if response is not None:
+            retry_after = response.headers.get('Retry-After')
+            if retry_after and retry_after.strip().isdigit():
+                return min(float(retry_after), self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+    
+    def _record(self, latency, failed):
+        with self.lock:
+            self.calls += 1
+            self.latencies.append(latency)
+            if failed:
+                self.failures += 1
+    
+    def _send(self, headers, files, data):
+        """Make one POST; if the current job is cancelled while it is in flight, raise ExtractionCancelled at once
+        
+        requests cannot interrupt a call that is waiting for the server, so inside a job the call runs on
+        a daemon thread that is abandoned on cancel; its response is closed when it arrives.
+        """
+        job = _current_job.get()
+        if job is None:
+            return self.session.post(self.url, headers=headers, files=files, data=data, timeout=self.timeout)
+        
+        outcome = {}
+        finished = threading.Event()
+        abandoned = threading.Event()
+        
+        def send():
+            try:
+                outcome["response"] = self.session.post(self.url, headers=headers, files=files, data=data, timeout=self.timeout)
+                if abandoned.is_set():
+                    outcome["response"].close()
+            except BaseException as e:
+                outcome["error"] = e
+            finally:
+                finished.set()
+        
+        threading.Thread(target=send, name="sarvam-request", daemon=True).start()
+        while not finished.wait(0.1):
+            if job.cancel_event.is_set():
+                abandoned.set()
+                raise ExtractionCancelled()
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome["response"]
+    
+    def post(self, headers, files, data):
+        """POST to the endpoint, retrying transient failures; returns the final response
+        
+        Raises requests.exceptions.RequestException if the last attempt failed without a response.
+        """
+        import requests
+        for attempt in range(self.max_retries + 1):
+            check_cancelled()
+            response = None
+            error = None
+            start = time.perf_counter()
+            with span("http", url=self.url, attempt=attempt + 1) as http_span:
+                try:
+                    response = self._send(headers, files, data)
+                    http_span.bytes = len(response.request.body or b"")
+                    http_span.fields["status"] = response.status_code
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                    error = e
+                    http_span.fields["status"] = type(e).__name__
+            latency = time.perf_counter() - start
+            
+            retryable = error is not None or response.status_code in self.RETRY_STATUS_CODES
+            self._record(latency, retryable)
+            status = response.status_code if response is not None else type(error).__name__
+            print(f"Sarvam AI API call took {latency:.2f}s (status {status}, attempt {attempt + 1})")
+            
+            if not retryable:
+                return response
+            if attempt == self.max_retries:
+                if response is not None:
+                    return response
+                raise error
+            
+            delay = self._backoff_delay(attempt, response)
+            with self.lock:
+                self.retries += 1
+            print(f"Retrying Sarvam AI API call in {delay:.2f}s...")
+            sleep_unless_cancelled(delay)
+    
+    def stats(self):
+        """Return call counts and latency percentiles (seconds) for this client"""
+        with self.lock:
+            latencies = sorted(self.latencies)
+            stats = {"calls": self.calls, "retries": self.retries, "failures": self.failures}
+        if latencies:
+            stats["latency_mean"] = sum(latencies) / len(latencies)
+            stats["latency_p50"] = latencies[int(0.50 * (len(latencies) - 1))]
+            stats["latency_p95"] = latencies[int(0.95 * (len(latencies) - 1))]
+            stats["latency_max"] = latencies[-1]
+        return stats
+
+_sarvam_client = None
+_sarvam_client_pid = None
+_sarvam_client_lock = threading.Lock()
+
+def get_sarvam_client():
+    """Return the shared Sarvam AI client for this process, creating it on first use
+    
+    Pooled connections cannot be shared across fork(), so each worker process gets its own client.
+    """
+    global _sarvam_client, _sarvam_client_pid
+    with _sarvam_client_lock:
+        if _sarvam_client is None or _sarvam_client_pid != os.getpid():
+            _sarvam_client = SarvamClient()
+            _sarvam_client_pid = os.getpid()
+        return _sarvam_client
+
+_tika_lock = threading.Lock()
+_tika_started = False
+
+def get_tika_parser():
+    """Import Tika and start its Java VM on first use; only the multilingual image fallback needs it"""
+    global _tika_started
+    import tika
+    from tika import parser
+    with _tika_lock:
+        if not _tika_started:
+            tika.initVM()
+            _tika_started = True
+    return parser
+
+@functools.lru_cache(maxsize=None)
+def get_ffmpeg_binary():
+    """Path of the ffmpeg executable bundled with moviepy"""
+    from moviepy.config import get_setting
+    return get_setting("FFMPEG_BINARY")
+
+class ExtractionCancelled(BaseException):
+    """Raised inside an extraction whose job has been cancelled
+    
+    Derived from BaseException so the extractors' broad `except Exception` error handling
+    does not turn a cancellation into an error result.
+    """
+
+class ExtractionJob:
+    """Progress reporting and cancellation for one running extraction"""
+    
+    def __init__(self, on_progress=None):
+        self.cancel_event = threading.Event()
+        self.on_progress = on_progress
+    
+    def cancel(self):
+        self.cancel_event.set()
+    
+    def report(self, done, total, unit):
+        if self.on_progress:
+            self.on_progress(done, total, unit)
+
+# The job of the extraction running in the current thread (propagated to segment and tile threads)
+_current_job = contextvars.ContextVar('current_job', default=None)
+
+@contextlib.contextmanager
+def run_as_job(job):
+    """Run the extraction inside this block as `job`, so it can report progress and be cancelled"""
+    token = _current_job.set(job)
+    try:
+        yield job
+    finally:
+        _current_job.reset(token)
+
+def check_cancelled():
+    """Raise ExtractionCancelled if the current job has been cancelled"""
+    job = _current_job.get()
+    if job is not None and job.cancel_event.is_set():
+        raise ExtractionCancelled()
+
+def sleep_unless_cancelled(seconds):
+    """Sleep, waking up early with ExtractionCancelled if the current job is cancelled"""
+    job = _current_job.get()
+    if job is None:
+        time.sleep(seconds)
+    elif job.cancel_event.wait(seconds):
+        raise ExtractionCancelled()
+
+class ProgressCounter:
+    """Thread-safe count of completed pages, segments or tiles, reported to the job that created it"""
+    
+    def __init__(self, total, unit):
+        self.job = _current_job.get()
+        self.total = total
+        self.unit = unit
+        self.done = 0
+        self.lock = threading.Lock()
+    
+    def advance(self, count=1):
+        with self.lock:
+            self.done += count
+            done = self.done
+        if self.job is not None:
+            self.job.report(min(done, self.total), self.total, self.unit)
+    
+    def set_total(self, total):
+        """Replace an estimated total once more is known, such as the number of segments actually cut"""
+        with self.lock:
+            self.total = total
+            done = self.done
+        if self.job is not None:
+            self.job.report(min(done, total), total, self.unit)
+
+class ExtractionStream:
+    """Text of an extraction that is produced incrementally, page by page or segment by segment
+
+    Iterating yields the text in chunks as they are extracted; concatenated, the chunks are the text
+    the non-streaming extractors return. The extraction method is only known once the stream is
+    exhausted, and is then available as `method`.
+    """
+
+    def __init__(self, chunks):
+        # chunks is a generator that yields text and returns the extraction method
+        self._chunks = chunks
+        self.method = None
+
+    def __iter__(self):
+        self.method = yield from self._chunks
+
+    def collect(self):
+        """Consume the whole stream into a {"text", "method"} result"""
+        text = "".join(self)
+        return {"text": text, "method": self.method}
+
+def stream_result(extraction_result):
+    """Stream an already complete {"text", "method"} result as a single chunk"""
+    yield extraction_result["text"]
+    return extraction_result["method"]
+
+# How much of a file detect_file_type reads to recognize its format
+FILE_SNIFF_BYTES = 4096
+
+# Extensions of plain text formats; their content wins over a binary signature only if it is text
+TEXT_EXTENSIONS = ('.txt', '.csv', '.md', '.json', '.xml', '.html')
+
+# MP4/QuickTime brands of audio-only files; every other ftyp brand is treated as video
+AUDIO_FTYP_BRANDS = (b'M4A ', b'M4B ', b'M4P ', b'F4A ', b'F4B ')
+
+def sniff_file_type(header):
+    """Recognize a file type from the first bytes of a file, or return None"""
+    # Byte order marks first: a UTF-16 BOM would otherwise look like an MP3 frame header
+    if header.startswith((b'\xef\xbb\xbf', b'\xff\xfe', b'\xfe\xff')):
+        return "Text"
+    
+    # Archives before everything else: the first member's data follows its header within the first kilobyte
+    if header.startswith((b'PK\x03\x04', b'PK\x05\x06')):
+        # Office and OpenDocument files are ZIP packages too, but not archives of separate files
+        if b'[Content_Types].xml' in header or header[30:38] == b'mimetype':
+            return None
+        return "Archive"
+    if header[257:262] == b'ustar':
+        return "Archive"
+    if header.startswith(b'\x1f\x8b'):
+        # A gzip file is a .tar.gz if its first decompressed block is a tar header
+        try:
+            first_block = zlib.decompressobj(16 + zlib.MAX_WBITS).decompress(header, 512)
+        except zlib.error:
+            return None
+        return "Archive" if first_block[257:262] == b'ustar' else None
+    
+    # PDF readers accept the header anywhere in the first kilobyte, but text that mentions it would match too;
+    # PDFs with leading junk are still recognized by their .pdf extension
+    if header.startswith(b'%PDF-'):
+        return "PDF"
+    
+    if header.startswith((b'\x89PNG\r\n\x1a\n', b'\xff\xd8\xff', b'GIF87a', b'GIF89a', b'II*\x00', b'MM\x00*')):
+        return "Image"
+    # BMP only has a two-byte magic, so also check the size of its info header
+    if header.startswith(b'BM') and len(header) >= 18 and int.from_bytes(header[14:18], 'little') in (12, 40, 52, 56, 64, 108, 124):
+        return "Image"
+    
+    if header.startswith(b'RIFF') and len(header) >= 12:
+        riff_type = header[8:12]
+        if riff_type == b'WEBP':
+            return "Image"
+        elif riff_type == b'WAVE':
+            return "Audio"
+        elif riff_type == b'AVI ':
+            return "Video"
+    
+    if header[4:8] == b'ftyp':
+        return "Audio" if header[8:12] in AUDIO_FTYP_BRANDS else "Video"
+    
+    if header.startswith(b'\x1a\x45\xdf\xa3'):
+        # Matroska / WebM
+        return "Video"
+    if header.startswith(b'FLV\x01'):
+        return "Video"
+    # Ogg pages start with the capture pattern and stream structure version 0
+    if header.startswith(b'OggS\x00'):
+        return "Video" if b'\x80theora' in header else "Audio"
+    if header.startswith(b'fLaC'):
+        return "Audio"
+    # ID3v2 tag: major version 2-4, no undefined flags, and a syncsafe size (the high bit of each byte clear)
+    if (header.startswith(b'ID3') and len(header) >= 10 and header[3] in (2, 3, 4) and header[4] != 0xFF
+            and header[5] & 0x0F == 0 and all(byte < 0x80 for byte in header[6:10])):
+        return "Audio"
+    # An MPEG audio frame (MP3) or ADTS (AAC) header: 11 sync bits, then a valid version and layer
+    if len(header) >= 2 and header[0] == 0xFF and header[1] & 0xE0 == 0xE0 and header[1] & 0x18 != 0x08:
+        return "Audio"
+    
+    return None
+
+def looks_like_quicktime(header):
+    """Whether a file starts like an old QuickTime movie, with an atom other than ftyp
+    
+    These four-letter atom names also occur in ordinary text ("The free software..."), so this is only
+    checked for files without a known extension, and the atom size in front of the name must be
+    plausible: 0 or 1 (size elsewhere), or at least 8 and small enough to start with a control byte.
+    """
+    if len(header) < 8 or header[4:8] not in (b'moov', b'mdat', b'wide', b'free', b'skip', b'pnot'):
+        return False
+    atom_size = int.from_bytes(header[0:4], 'big')
+    return atom_size in (0, 1) or (atom_size >= 8 and header[0] < 0x20)
+
+def looks_like_text(header):
+    """Guess whether a file with an unknown format is text: no NUL bytes and valid UTF-8 (apart from a cut-off last character)"""
+    if not header or b'\x00' in header:
+        return False
+    try:
+        header.decode('utf-8')
+    except UnicodeDecodeError as e:
+        # The sample may end in the middle of a multi-byte character
+        return e.start >= len(header) - 3
+    return True
+
 # Function to detect file type based on extension and mime type
 def detect_file_type(file_path):
-    """Detect the type of file based on extension and content"""
-    # Initialize mimetypes
-    mimetypes.init()
+    """Detect the type of file from its content, falling back to its extension and mime type
+    
+    Only the first FILE_SNIFF_BYTES of the file are read, so renamed and extension-less files
+    (such as the server's uploads) are routed to the right extractor.
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            header = f.read(FILE_SNIFF_BYTES)
+    except OSError:
+        header = b''
     
     # Get file extension and convert to lowercase
     ext = os.path.splitext(file_path)[1].lower()
+    # A text file can start with bytes that happen to match a short signature ("BM", "OggS", ...),
+    # so a text extension wins as long as the content really is text
+    if ext in TEXT_EXTENSIONS and looks_like_text(header):
+        return "Text"
+    
+    sniffed_type = sniff_file_type(header)
+    if sniffed_type:
+        return sniffed_type
+    
+    # guess_type loads the system mime databases the first time it is called
     mime_type, _ = mimetypes.guess_type(file_path)
     
     # Determine file type based on extension and mime type
-    if ext in ['.txt', '.csv', '.md', '.json', '.xml', '.html']:
+    if ext in TEXT_EXTENSIONS:
         return "Text"
     elif ext == '.pdf' or (mime_type and mime_type == 'application/pdf'):
         return "PDF"
@@ -61,6 +782,11 @@ def detect_file_type(file_path):
         return "Audio"
     elif ext in ['.mp4', '.avi', '.mov', '.mkv', '.webm', '.flv']:
         return "Video"
+    elif file_path.lower().endswith(ARCHIVE_EXTENSIONS):
+        # .tar.bz2 and .tar.xz archives are only recognized by their extension
+        return "Archive"
+    elif looks_like_quicktime(header):
+        return "Video"
     else:
         # Try to determine based on mime type
         if mime_type:
@@ -73,83 +799,510 @@ def detect_file_type(file_path):
             elif mime_type.startswith('video/'):
                 return "Video"
         
-        # If all else fails, assume it might be a text file
+        # Files without a known signature or extension are extracted as text if they look like text
+        if looks_like_text(header):
+            return "Text"
         return "Unknown"
 
 # Text extraction functions for different file types
 def extract_text_from_txt(file_path):
     """Extract text from a plain text file"""
+    return ExtractionStream(stream_txt_text(file_path)).collect()
+
+# Byte order marks and the encodings they identify; UTF-32 first, as its little-endian BOM starts like UTF-16's
+TEXT_BOMS = [
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+
+def detect_text_encoding(head):
+    """Pick the encoding of a text file from a sample of its first bytes"""
+    for bom, encoding in TEXT_BOMS:
+        if head.startswith(bom):
+            return encoding
+    
+    # UTF-16 without a BOM: mostly ASCII text has a NUL in every other byte
+    if b'\x00' in head:
+        half = len(head) // 2
+        even_nuls = head[0::2].count(0)
+        odd_nuls = head[1::2].count(0)
+        if odd_nuls > half * 0.3 and even_nuls < half * 0.05:
+            return 'utf-16-le'
+        if even_nuls > half * 0.3 and odd_nuls < half * 0.05:
+            return 'utf-16-be'
+    
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return {"text": f.read(), "method": "UTF-8 Text Parser"}
-    except UnicodeDecodeError:
-        # Try with different encodings for multilingual support
-        for encoding in ['latin-1', 'iso-8859-1', 'utf-16', 'utf-32']:
+        head.decode('utf-8')
+        return 'utf-8'
+    except UnicodeDecodeError as e:
+        # The sample may end in the middle of a multi-byte character
+        if e.reason == 'unexpected end of data':
+            return 'utf-8'
+    # Every byte sequence is valid latin-1
+    return 'latin-1'
+
+def stream_txt_text(file_path):
+    """Yield the text of a text file in chunks, returning the extraction method at the end
+    
+    The encoding is detected once from the head of the file, which is then decoded incrementally, so
+    the file is read a single time and never held in memory as bytes. Files larger than TEXT_MAX_BYTES
+    are truncated.
+    """
+    file_size = os.path.getsize(file_path)
+    with open(file_path, 'rb') as f:
+        chunk = f.read(TEXT_CHUNK_BYTES)
+        encoding = detect_text_encoding(chunk[:64 * 1024])
+        decoder = codecs.getincrementaldecoder(encoding)(errors='strict')
+        invalid_bytes = False
+        bytes_read = 0
+        
+        while chunk:
+            if TEXT_MAX_BYTES and bytes_read + len(chunk) > TEXT_MAX_BYTES:
+                chunk = chunk[:TEXT_MAX_BYTES - bytes_read]
+            bytes_read += len(chunk)
             try:
-                with open(file_path, 'r', encoding=encoding) as f:
-                    return {"text": f.read(), "method": f"{encoding} Text Parser"}
+                text = decoder.decode(chunk)
             except UnicodeDecodeError:
-                continue
-        # If all encodings fail, try binary mode and decode with errors ignored
-        with open(file_path, 'rb') as f:
-            return {"text": f.read().decode('utf-8', errors='replace'), "method": "Binary/Fallback Text Parser"}
+                # Invalid bytes after a valid head; replace them rather than reading the file again
+                invalid_bytes = True
+                decoder.errors = 'replace'
+                text = decoder.decode(chunk)
+            if text:
+                yield text
+            check_cancelled()
+            if TEXT_MAX_BYTES and bytes_read >= TEXT_MAX_BYTES:
+                break
+            chunk = f.read(TEXT_CHUNK_BYTES)
+        
+        # A truncated file may end in the middle of a character, which is dropped
+        truncated = bytes_read < file_size
+        if truncated:
+            decoder.errors = 'ignore'
+        try:
+            text = decoder.decode(b'', final=True)
+        except UnicodeDecodeError:
+            invalid_bytes = True
+            decoder.errors = 'replace'
+            text = decoder.decode(b'', final=True)
+        if text:
+            yield text
+    
+    if encoding in ('utf-8', 'utf-8-sig'):
+        method = "UTF-8 Text Parser"
+    else:
+        method = f"{encoding} Text Parser"
+    if invalid_bytes:
+        method += " (invalid bytes replaced)"
+    if truncated:
+        yield f"\n\n[Truncated: only the first {bytes_read / (1024 * 1024):.0f} MB of this {file_size / (1024 * 1024):.0f} MB file were read]"
+        method += " (truncated)"
+    return method
 
-def extract_text_from_pdf(file_path):
-    """Extract text from a PDF file using PyPDF2"""
+def render_pdf_page(file_path, page, page_index):
+    """Return PIL images for a PDF page without a text layer, for OCR
+    
+    The page is rasterized with pdf2image (poppler) when it is installed. Otherwise the images embedded
+    in the page are used, which for scanned documents is the scan itself.
+    """
     try:
-        text = ""
-        with open(file_path, 'rb') as file:
-            # Create PDF reader object
-            pdf_reader = PyPDF2.PdfReader(file)
-            
-            # Get number of pages
-            num_pages = len(pdf_reader.pages)
-            
-            # Extract text from each page
-            for page_num in range(num_pages):
-                page = pdf_reader.pages[page_num]
-                text += f"\n--- Page {page_num + 1} ---\n"
-                text += page.extract_text()
+        from pdf2image import convert_from_path
+    except ImportError:
+        from PIL import Image
+        return [Image.open(io.BytesIO(embedded.data)) for embedded in page.images]
+    return convert_from_path(file_path, dpi=PDF_OCR_DPI, first_page=page_index + 1, last_page=page_index + 1)
+
+def iter_pdf_page_texts(file_path, page_indexes, progress=None):
+    """Extract the text of some pages of a PDF, OCR-ing pages that have no text layer
+    
+    Yields a (page_index, text, used_ocr) tuple per page as soon as it is done, and reports each page
+    to `progress` (a ProgressCounter) if given.
+    """
+    import PyPDF2
+    with open(file_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        for page_index in page_indexes:
+            check_cancelled()
+            with span("pdf.page", file=file_path, page=page_index + 1) as page_span:
+                page = pdf_reader.pages[page_index]
+                text = page.extract_text() or ""
+                used_ocr = False
                 
-        if text.strip():
-            return {"text": text, "method": "PyPDF2"}
-        else:
-            return {"text": "No text could be extracted from this PDF. It might be scanned or contain only images.", "method": "PyPDF2 failed"}
+                if not text.strip():
+                    # Probably a scanned page: render it and send it through the image OCR path
+                    try:
+                        with span("pdf.render", page=page_index + 1):
+                            page_images = render_pdf_page(file_path, page, page_index)
+                        page_texts = [recognize_image(img)[0] for img in page_images]
+                        text = "\n".join(page_text for page_text in page_texts if page_text.strip())
+                        used_ocr = bool(text.strip())
+                    except Exception as ocr_error:
+                        print(f"Warning: OCR failed for page {page_index + 1} of {file_path}: {ocr_error}")
+                
+                page_span.bytes = len(text.encode('utf-8'))
+                page_span.fields["ocr"] = used_ocr
             
+            yield page_index, text, used_ocr
+            if progress:
+                progress.advance()
+
+def extract_pdf_pages(file_path, page_indexes):
+    """Return the (page_index, text, used_ocr) tuples for some pages of a PDF; runs in a worker process for large PDFs"""
+    return list(iter_pdf_page_texts(file_path, page_indexes))
+
+def iter_pdf_pages(file_path, num_pages, progress):
+    """Yield (page_index, text, used_ocr) for every page of a PDF, in page order
+    
+    Large PDFs are split across worker processes; their pages are yielded chunk by chunk as the
+    chunks complete, smaller ones page by page in this process.
+    """
+    workers = max(1, min(PDF_PAGE_WORKERS, num_pages))
+    if workers == 1 or num_pages < PDF_PARALLEL_MIN_PAGES:
+        yield from iter_pdf_page_texts(file_path, range(num_pages), progress)
+        return
+    
+    # Split the pages into contiguous chunks, a few per worker so uneven pages balance out
+    chunk_count = workers * 4
+    chunk_size = max(1, (num_pages + chunk_count - 1) // chunk_count)
+    chunks = [range(start, min(start + chunk_size, num_pages)) for start in range(0, num_pages, chunk_size)]
+    print(f"Extracting {num_pages} pages using {workers} worker processes...")
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        for chunk_results in executor.map(extract_pdf_pages, [file_path] * len(chunks), chunks):
+            progress.advance(len(chunk_results))
+            check_cancelled()
+            yield from chunk_results
+    finally:
+        # On cancellation, or when the consumer stops early, drop the chunks that have not started yet
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def stream_pdf_text(file_path):
+    """Yield the text of a PDF page by page, returning the extraction method at the end
+    
+    Used through an ExtractionStream; see extract_text_from_pdf() for the method names.
+    """
+    try:
+        import PyPDF2
+        with open(file_path, 'rb') as file:
+            # Get number of pages
+            num_pages = len(PyPDF2.PdfReader(file).pages)
+        
+        progress = ProgressCounter(num_pages, "pages")
+        pages_with_text = 0
+        ocr_pages = 0
+        # Leading pages without text are held back, so a PDF without any text only produces the message below
+        held_back = []
+        
+        for page_index, page_text, used_ocr in iter_pdf_pages(file_path, num_pages, progress):
+            page_output = f"\n--- Page {page_index + 1} ---\n{page_text}"
+            if not pages_with_text and not page_text.strip():
+                held_back.append(page_output)
+                continue
+            if page_text.strip():
+                pages_with_text += 1
+                ocr_pages += used_ocr
+            if held_back:
+                yield "".join(held_back)
+                held_back = []
+            yield page_output
+        
+        if not pages_with_text:
+            yield "No text could be extracted from this PDF, even with OCR of its scanned pages."
+            return "PyPDF2 failed"
+        if ocr_pages:
+            return f"PyPDF2 + Tesseract OCR ({ocr_pages} of {num_pages} pages scanned)"
+        return "PyPDF2"
+    
     except Exception as e:
-        return {"text": f"Error extracting text from PDF: {str(e)}", "method": "Error"}
+        yield f"Error extracting text from PDF: {str(e)}"
+        return "Error"
+
+def extract_text_from_pdf(file_path):
+    """Extract text from a PDF file using PyPDF2, with Tesseract OCR for scanned pages"""
+    return ExtractionStream(stream_pdf_text(file_path)).collect()
+
+@functools.lru_cache(maxsize=None)
+def use_tesserocr():
+    """Whether OCR runs in-process through tesserocr, according to OCR_ENGINE and what is installed"""
+    if OCR_ENGINE == 'pytesseract':
+        return False
+    try:
+        importlib.import_module("tesserocr")
+        return True
+    except ImportError:
+        if OCR_ENGINE == 'tesserocr':
+            print("Warning: OCR_ENGINE is tesserocr but tesserocr is not installed, using pytesseract")
+        return False
+
+def ocr_engine_name():
+    """Name of the library that runs OCR in this process, tesserocr or pytesseract"""
+    return "tesserocr" if use_tesserocr() else "pytesseract"
+
+class TesseractEnginePool:
+    """Initialized tesserocr API handles kept for reuse, one pool per language configuration
+    
+    Creating a handle loads the traineddata for its languages, which is what makes a tesseract process
+    per call slow. A handle serves one thread at a time, so each OCR call borrows an idle handle for
+    its configuration (creating one if all are busy) and gives it back afterwards. Handles are not
+    shared across fork(), so each worker process builds its own.
+    """
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.idle = {}
+        self.pid = os.getpid()
+    
+    @contextlib.contextmanager
+    def engine(self, languages, psm):
+        import tesserocr
+        key = (languages, psm)
+        with self.lock:
+            if self.pid != os.getpid():
+                self.idle = {}
+                self.pid = os.getpid()
+            handles = self.idle.setdefault(key, [])
+            api = handles.pop() if handles else None
+        if api is None:
+            with span("ocr.init", languages=languages):
+                api = tesserocr.PyTessBaseAPI(lang=languages, psm=psm)
+        try:
+            yield api
+        finally:
+            api.Clear()
+            with self.lock:
+                self.idle.setdefault(key, []).append(api)
+
+tesseract_engines = TesseractEnginePool()
+
+@functools.lru_cache(maxsize=None)
+def installed_tesseract_languages():
+    """Language packs available to Tesseract, looked up once per process"""
+    try:
+        if use_tesserocr():
+            import tesserocr
+            return frozenset(tesserocr.get_languages()[1])
+        import pytesseract
+        return frozenset(pytesseract.get_languages(config=''))
+    except Exception:
+        return frozenset()
+
+@functools.lru_cache(maxsize=None)
+def tesseract_languages_for_script(script):
+    """Tesseract language string for a script detected by OSD"""
+    language = SCRIPT_LANGUAGES.get(script)
+    if not language:
+        # A script we have no specific pack for: use every configured pack
+        return TESSERACT_LANGUAGES
+    
+    # Indic text is often mixed with English (code, product names), so keep English loaded as well
+    languages = [language] if language == 'eng' else [language, 'eng']
+    installed = installed_tesseract_languages()
+    if installed:
+        languages = [lang for lang in languages if lang in installed] or ['eng']
+    return '+'.join(languages)
+
+def detect_script(img):
+    """Detect the dominant script of an image with Tesseract OSD, or None if it cannot tell"""
+    if use_tesserocr():
+        import tesserocr
+        with span("ocr.osd", bytes=img.width * img.height), tesseract_engines.engine('osd', tesserocr.PSM.OSD_ONLY) as api:
+            api.SetImage(img)
+            try:
+                osd = api.DetectOrientationScript()
+            except RuntimeError:
+                osd = None
+        # OSD needs a minimum amount of text (and osd.traineddata) to make a decision
+        return osd.get('script_name') if osd else None
+    
+    import pytesseract
+    try:
+        with span("ocr.osd", bytes=img.width * img.height):
+            osd = pytesseract.image_to_osd(img, output_type=pytesseract.Output.DICT)
+        return osd.get('script')
+    except pytesseract.TesseractError:
+        # OSD needs a minimum amount of text (and osd.traineddata) to make a decision
+        return None
+
+def select_ocr_languages(img):
+    """Choose the language packs to load for an image according to TESSERACT_OCR_MODE"""
+    if TESSERACT_OCR_MODE != 'script':
+        return TESSERACT_LANGUAGES
+    script = detect_script(img)
+    if script is None:
+        # OSD could not tell the script (little text, or OSD data missing): use every pack rather than miss non-Latin text
+        return TESSERACT_LANGUAGES
+    return tesseract_languages_for_script(script)
+
+def ocr_image(img, languages=None):
+    """Run Tesseract on a PIL image with the configured page segmentation mode
+    
+    Languages are selected with select_ocr_languages() unless given. Uses a pooled in-process
+    tesserocr engine when available, otherwise a pytesseract subprocess.
+    """
+    if languages is None:
+        languages = select_ocr_languages(img)
+    if use_tesserocr():
+        # The image is handed to the loaded engine in memory
+        with span("ocr", languages=languages, bytes=img.width * img.height), tesseract_engines.engine(languages, TESSERACT_PSM) as api:
+            api.SetImage(img)
+            return api.GetUTF8Text()
+    
+    import pytesseract
+    with span("ocr", languages=languages, bytes=img.width * img.height):
+        return pytesseract.image_to_string(
+            img, 
+            lang=languages,
+            config=f'--psm {TESSERACT_PSM}'
+        )
+
+def otsu_threshold(gray):
+    """Compute the Otsu binarization threshold of a grayscale image from its histogram"""
+    histogram = gray.histogram()
+    total = sum(histogram)
+    weighted_total = sum(value * count for value, count in enumerate(histogram))
+    background_weight = 0
+    background_sum = 0
+    best_variance = 0
+    threshold = 127
+    for value, count in enumerate(histogram):
+        background_weight += count
+        if background_weight == 0:
+            continue
+        foreground_weight = total - background_weight
+        if foreground_weight == 0:
+            break
+        background_sum += value * count
+        background_mean = background_sum / background_weight
+        foreground_mean = (weighted_total - background_sum) / foreground_weight
+        variance = background_weight * foreground_weight * (background_mean - foreground_mean) ** 2
+        if variance > best_variance:
+            best_variance = variance
+            threshold = value
+    return threshold
+
+def preprocess_image(img):
+    """Prepare an image for OCR: fix EXIF orientation, convert to grayscale, downscale and binarize"""
+    from PIL import Image, ImageOps
+    # Work out the target scale first so JPEG decoding can already downscale (draft mode keeps memory low)
+    scale = 1.0
+    dpi = img.info.get('dpi')
+    if dpi and dpi[0] and dpi[0] > OCR_TARGET_DPI:
+        scale = OCR_TARGET_DPI / float(dpi[0])
+    longest_side = max(img.size)
+    if longest_side * scale > OCR_MAX_DIMENSION:
+        scale = OCR_MAX_DIMENSION / float(longest_side)
+    target_side = max(1, int(longest_side * scale))
+    if scale < 1.0 and img.format == 'JPEG':
+        img.draft('L', (int(img.width * scale), int(img.height * scale)))
+    
+    # Phone photos are often stored sideways with an EXIF orientation tag
+    img = ImageOps.exif_transpose(img)
+    
+    # Flatten transparency onto white, otherwise transparent screenshot backgrounds turn black
+    if img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info):
+        img = img.convert('RGBA')
+        background = Image.new('RGBA', img.size, (255, 255, 255, 255))
+        img = Image.alpha_composite(background, img)
+    gray = img.convert('L')
+    
+    # Draft decoding only gets close to the target size, so finish the downscale here
+    longest_side = max(gray.size)
+    if target_side < longest_side:
+        ratio = target_side / float(longest_side)
+        gray = gray.resize((max(1, int(gray.width * ratio)), max(1, int(gray.height * ratio))), Image.LANCZOS)
+    
+    if OCR_BINARIZE:
+        threshold = otsu_threshold(gray)
+        gray = gray.point([0 if value <= threshold else 255 for value in range(256)])
+    return gray
+
+def split_image_into_tiles(img):
+    """Split a tall image into horizontal strips in reading order, cutting through the blankest rows"""
+    from PIL import Image
+    if img.height < OCR_TILE_HEIGHT * 2:
+        return [img]
+    
+    # Average brightness of every row; the lightest rows are gaps between lines of text
+    row_brightness = list(img.resize((1, img.height), Image.BOX).getdata())
+    search_margin = OCR_TILE_HEIGHT // 10
+    
+    tiles = []
+    top = 0
+    while img.height - top > OCR_TILE_HEIGHT * 1.5:
+        target = top + OCR_TILE_HEIGHT
+        window = range(target - search_margin, target + search_margin)
+        cut = max(window, key=lambda row: row_brightness[row])
+        tiles.append(img.crop((0, top, img.width, cut)))
+        top = cut
+    tiles.append(img.crop((0, top, img.width, img.height)))
+    return tiles
+
+def recognize_image(img, languages=None):
+    """Preprocess an image, OCR its tiles in parallel and return (text, languages)
+    
+    Languages are selected once, on the first tile, unless given.
+    """
+    with span("image.preprocess", bytes=img.width * img.height):
+        img = preprocess_image(img)
+        tiles = split_image_into_tiles(img)
+    if languages is None:
+        languages = select_ocr_languages(tiles[0])
+    
+    if len(tiles) == 1:
+        return ocr_image(tiles[0], languages), languages
+    
+    print(f"Large image split into {len(tiles)} tiles for OCR")
+    progress = ProgressCounter(len(tiles), "tiles")
+    # pytesseract runs Tesseract in a subprocess and tesserocr releases the GIL, so threads are enough to use every core
+    with ThreadPoolExecutor(max_workers=max(1, min(OCR_TILE_WORKERS, len(tiles)))) as executor:
+        futures = [submit_in_context(executor, ocr_image, tile, languages) for tile in tiles]
+        for future in futures:
+            future.add_done_callback(lambda _: progress.advance())
+        tile_texts = [future.result() for future in futures]
+    return "\n".join(text.strip() for text in tile_texts if text.strip()), languages
 
 def extract_text_from_image(file_path):
-    """Extract text from an image file using pytesseract with Indic language support and Tika as fallback"""
+    """Extract text from an image file using pytesseract with Indic language support
+    
+    In "script" OCR mode a single recognition pass runs with the language packs for the detected script.
+    In "multilingual" mode all packs are used, with Tika and an English-only pass as fallbacks.
+    """
     try:
+        from PIL import Image
+        
         # Open the image using PIL
         img = Image.open(file_path)
         
-        print("Attempting OCR with pytesseract using Indic language packs...")
+        if TESSERACT_OCR_MODE == 'script':
+            text, languages = recognize_image(img)
+            print(f"OCR with {ocr_engine_name()} used language packs: {languages}")
+            if text.strip():
+                return {"text": text, "method": f"Tesseract OCR ({languages})"}
+            return {"text": "No text could be detected in this image.", "method": "Tesseract OCR (no text detected)"}
+        
+        print(f"Attempting OCR with {ocr_engine_name()} using Indic language packs...")
         
         # Use pytesseract to extract text with all Indic languages we have installed
         # This includes Bengali, Hindi, Tamil, Telugu, Kannada, Malayalam and English
-        text = pytesseract.image_to_string(
-            img, 
-            lang='eng+ben+hin+tam+tel+kan+mal',
-            config='--psm 6'
-        )
+        text, _ = recognize_image(img, TESSERACT_LANGUAGES)
         
         # If we got text, return it immediately
         if text.strip():
             return {"text": text, "method": "Tesseract OCR (multilingual)"}
             
-        # If pytesseract didn't get any text, try with Tika as fallback
-        print("Pytesseract returned no text, trying with Apache Tika...")
+        # If Tesseract didn't get any text, try with Tika as fallback
+        print("Tesseract returned no text, trying with Apache Tika...")
         try:
-            parsed = parser.from_file(file_path)
+            parsed = get_tika_parser().from_file(file_path)
             if parsed and 'content' in parsed and parsed['content'] and parsed['content'].strip():
                 return {"text": parsed['content'].strip(), "method": "Apache Tika (fallback)"}
         except Exception as tika_error:
             print(f"Tika error: {str(tika_error)}. Will try one more method.")
             
         # Last resort: try with English only if neither method worked
-        text = pytesseract.image_to_string(img, lang='eng')
+        text, _ = recognize_image(img, 'eng')
         if text.strip():
             return {"text": text, "method": "Tesseract OCR (English only)"}
         else:
@@ -159,21 +1312,39 @@ def extract_text_from_image(file_path):
 
 def extract_text_from_audio(file_path):
     """Extract text from an audio file using Sarvam AI's speech-to-text API"""
+    return ExtractionStream(stream_audio_text(file_path)).collect()
+
+def stream_audio_text(file_path):
+    """Yield the transcript of an audio file as it is produced, returning the extraction method at the end
+    
+    Long audio is yielded segment by segment as the segments are transcribed.
+    """
     # Track whether we're using a temporary file that needs cleanup
     using_temp_file = False
     temp_audio_path = None
     
     try:
-        if not SARVAM_API_KEY:
-            return {"text": "Cannot process audio: Sarvam AI API key not set. Please set SARVAM_API_KEY environment variable.", 
-                    "method": "Error: Missing API Key"}
-        
         print(f"Processing audio file: {file_path}")
         
-        # Prepare the API request
-        headers = {
-            'api-subscription-key': SARVAM_API_KEY
-        }
+        # Check audio duration to determine which API to use
+        audio_duration = get_audio_duration(file_path)
+        print(f"Audio duration: {audio_duration:.2f} seconds")
+        
+        backend = choose_transcription_backend(audio_duration)
+        unavailable = backend_unavailable_message(backend)
+        if unavailable:
+            yield unavailable[0]
+            return unavailable[1]
+        
+        with transcription_load.reserve(backend.name, audio_duration):
+            if audio_duration > 30:
+                # Longer audio is decoded straight to 16 kHz mono segments, so no format conversion is needed
+                return (yield from stream_long_audio(file_path, backend, total_duration=audio_duration))
+            if backend.name != "sarvam":
+                return (yield from stream_result(transcribe_short_pcm(file_path, backend)))
+        
+        # Short audio is uploaded to the real-time API as it is, if the API accepts its format
+        headers = backend.headers
         
         # Check if we need to convert the file to a supported format
         file_ext = os.path.splitext(file_path)[1].lower()
@@ -194,9 +1365,11 @@ def extract_text_from_audio(file_path):
                     temp_audio_path = temp_audio_file.name
                 
                 # Use moviepy to convert audio to WAV
-                audio_clip = AudioFileClip(file_path)
-                audio_clip.write_audiofile(temp_audio_path, codec='pcm_s16le')
-                audio_clip.close()
+                with span("convert", format=file_ext):
+                    from moviepy.editor import AudioFileClip
+                    audio_clip = AudioFileClip(file_path)
+                    audio_clip.write_audiofile(temp_audio_path, codec='pcm_s16le')
+                    audio_clip.close()
                 
                 # Use the converted file instead
                 print(f"Converted audio to {temp_audio_path}")
@@ -210,26 +1383,20 @@ def extract_text_from_audio(file_path):
                         os.unlink(temp_audio_path)
                     except:
                         pass
-                return {"text": f"Error converting audio to supported format: {str(conv_error)}", "method": "Error: Format Conversion"}
+                yield f"Error converting audio to supported format: {str(conv_error)}"
+                return "Error: Format Conversion"
         else:
             # Use the format from our mapping
             content_type = supported_formats[file_ext]
         
-        # Check audio duration to determine which API to use
-        audio_duration = get_audio_duration(file_path)
-        print(f"Audio duration: {audio_duration:.2f} seconds")
-        
-        if audio_duration <= 30:
-            # For short audio (<= 30 seconds), use the real-time API
-            return process_short_audio(file_path, content_type, headers)
-        else:
-            # For longer audio (> 30 seconds), use the batch API
-            return process_long_audio(file_path, content_type, headers)
+        # For short audio (<= 30 seconds), use the real-time API
+        return (yield from stream_result(process_short_audio(file_path, content_type, headers)))
         
     except Exception as e:
         error_message = f"Error extracting text from audio: {str(e)}"
         print(error_message)
-        return {"text": error_message, "method": "Error"}
+        yield error_message
+        return "Error"
     finally:
         # Clean up temporary file if one was created
         if using_temp_file and temp_audio_path and os.path.exists(temp_audio_path):
@@ -239,10 +1406,16 @@ def extract_text_from_audio(file_path):
             except Exception as cleanup_error:
                 print(f"Warning: Failed to delete temporary audio file: {cleanup_error}")
 
-def process_short_audio(file_path, content_type, headers):
-    """Process short audio files (<=30 seconds) using the real-time API"""
+def process_short_audio(file_path, content_type, headers, audio_data=None):
+    """Process short audio files (<=30 seconds) using the real-time API
+    
+    If audio_data (bytes) is given it is uploaded instead of reading file_path,
+    which is then only used as the upload file name.
+    """
+    import requests
+    
     # Check if file exists
-    if not os.path.exists(file_path):
+    if audio_data is None and not os.path.exists(file_path):
         return {"text": f"Error: Audio file not found: {file_path}", "method": "Error: File not found"}
     
     # Verify the API key is in headers
@@ -264,29 +1437,25 @@ def process_short_audio(file_path, content_type, headers):
     
     # Use the speech-to-text-translate endpoint which handles both transcription and translation
     try:
+        if audio_data is None:
+            with open(file_path, 'rb') as audio_file:
+                audio_data = audio_file.read()
+        
         files = {
-            'file': (os.path.basename(file_path), open(file_path, 'rb'), content_type)
+            'file': (os.path.basename(file_path), audio_data, content_type)
         }
         
         data = {
-            'model': 'saaras:v2',
+            'model': SARVAM_MODEL,
             'source_language': 'auto-detect',
             'target_language': 'en'
         }
         
-        print(f"Using content type: {content_type} and model: saaras:v2")
+        print(f"Using content type: {content_type} and model: {SARVAM_MODEL}")
         print(f"Headers keys: {list(headers.keys())}")
         print("Attempting speech recognition and translation with Sarvam AI real-time API...")
         
-        response = requests.post(
-            SARVAM_SPEECH_TO_TEXT_TRANSLATE_URL, 
-            headers=headers, 
-            files=files,
-            data=data
-        )
-        
-        # Close the file
-        files['file'][1].close()
+        response = get_sarvam_client().post(headers=headers, files=files, data=data)
         
         if response.status_code == 200:
             result = response.json()
@@ -331,252 +1500,1470 @@ def process_short_audio(file_path, content_type, headers):
         traceback.print_exc()
         return {"text": error_msg, "method": "Error: Processing"}
 
-def process_long_audio(file_path, content_type, headers):
-    """Process longer audio files (>30 seconds) by splitting into 30-second chunks"""
-    print("Audio is longer than 30 seconds. Processing in smaller segments...")
-    
+def process_audio_segment(wav_data, i, start_time, end_time, headers):
+    """Transcribe one 16 kHz mono WAV segment of a long audio file"""
     try:
-        # First, verify that the file exists
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"Audio file not found: {file_path}")
-        
-        # Use direct methods to get duration
-        audio_clip = AudioFileClip(file_path)
-        total_duration = audio_clip.duration
-        audio_clip.close()
-        
-        # Calculate the number of segments we'll need to process
-        segment_length = 30.0  # 30 seconds per segment
-        num_segments = int(total_duration / segment_length) + (1 if total_duration % segment_length > 0 else 0)
+        # Wait for our turn before sending this segment to the real-time API
+        check_cancelled()
+        with span("ratelimit.wait", segment=i+1):
+            sarvam_rate_limiter.acquire()
+        print(f"Sending segment {i+1} ({start_time:.2f}s to {end_time:.2f}s) to Sarvam AI API...")
+        with span("transcribe.segment", segment=i+1, bytes=len(wav_data)):
+            segment_result = process_short_audio(f"segment_{i+1}.wav", "audio/wav", headers, audio_data=wav_data)
         
-        print(f"Total audio duration: {total_duration:.2f} seconds")
-        print(f"Processing in {num_segments} segments of approximately {segment_length} seconds each")
-        
-        segment_results = []
-        
-        # Process each segment separately using the original file
-        for i in range(num_segments):
-            start_time = i * segment_length
-            end_time = min((i + 1) * segment_length, total_duration)
-            
-            print(f"Processing segment {i+1}/{num_segments} ({start_time:.2f}s to {end_time:.2f}s)...")
-            
-            # For each segment, we'll extract a new file with just that segment
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as segment_file:
-                segment_path = segment_file.name
-            
-            try:
-                # Create a subclip for this segment
-                segment_audio = AudioFileClip(file_path).subclip(start_time, end_time)
-                # Write the segment to a file
-                segment_audio.write_audiofile(
-                    segment_path, 
-                    codec='pcm_s16le', 
-                    fps=16000,  # Use a standard sample rate for speech
-                    nbytes=2,   # 16-bit audio
-                    verbose=False, 
-                    logger=None,
-                    ffmpeg_params=["-ac", "1"]  # Force mono channel
-                )
-                segment_audio.close()
-                
-                # Verify the segment file exists and has content
-                if not os.path.exists(segment_path) or os.path.getsize(segment_path) == 0:
-                    print(f"Warning: Failed to create valid segment {i+1}. Skipping.")
-                    continue
-                
-                # Process this segment with the real-time API
-                print(f"Sending segment {i+1}/{num_segments} to Sarvam AI API...")
-                
-                # Use segment path directly with the API
-                segment_result = process_short_audio(segment_path, "audio/wav", headers)
-                
-                # Store the result
-                segment_results.append({
-                    "segment": i+1,
-                    "start_time": start_time,
-                    "end_time": end_time,
-                    "text": segment_result["text"],
-                    "method": segment_result["method"]
-                })
-                
-                # Add a brief pause to avoid rate limiting
-                time.sleep(1)
-                
-            except Exception as e:
-                print(f"Error processing segment {i+1}: {e}")
-                import traceback
-                traceback.print_exc()
-            finally:
-                # Clean up the temporary segment file
-                try:
-                    if os.path.exists(segment_path):
-                        os.unlink(segment_path)
-                except Exception as cleanup_error:
-                    print(f"Warning: Failed to delete temporary segment file: {cleanup_error}")
+        return {
+            "segment": i+1,
+            "start_time": start_time,
+            "end_time": end_time,
+            "text": segment_result["text"],
+            "method": segment_result["method"]
+        }
+    
+    except Exception as e:
+        print(f"Error processing segment {i+1}: {e}")
+        traceback.print_exc()
+        return None
+
+class TranscriptionBackend:
+    """A speech-to-text engine that turns 16 kHz mono PCM segments into transcripts
+    
+    transcribe() takes up to batch_size (index, start_time, end_time, pcm) segments and returns one
+    result per segment, in the format of process_audio_segment(), or None for a segment that failed.
+    Up to `workers` calls run at once.
+    """
+    
+    name = None
+    batch_size = 1
+    workers = 1
+    
+    def transcribe(self, segments):
+        raise NotImplementedError
+    
+    def describe(self):
+        return f"{self.name} with {self.workers} worker(s)"
+
+class SarvamBackend(TranscriptionBackend):
+    """Sarvam AI's real-time speech-to-text-translate API, one segment per rate-limited request"""
+    
+    name = "sarvam"
+    
+    def __init__(self, headers):
+        self.headers = headers
+        self.workers = SARVAM_MAX_CONCURRENT_REQUESTS
+    
+    def transcribe(self, segments):
+        return [process_audio_segment(pcm_to_wav_bytes(pcm), i, start_time, end_time, self.headers)
+                for i, start_time, end_time, pcm in segments]
+    
+    def describe(self):
+        return f"up to {self.workers} concurrent requests ({SARVAM_REQUESTS_PER_SECOND} requests/second)"
+
+@functools.lru_cache(maxsize=None)
+def local_asr_available():
+    """Whether faster-whisper is installed, without importing it"""
+    return importlib.util.find_spec("faster_whisper") is not None
+
+_local_asr_pipeline = None
+_local_asr_pid = None
+_local_asr_lock = threading.Lock()
+
+def get_local_asr_pipeline():
+    """Return this process's batched faster-whisper pipeline, loading the model on first use"""
+    global _local_asr_pipeline, _local_asr_pid
+    with _local_asr_lock:
+        if _local_asr_pipeline is None or _local_asr_pid != os.getpid():
+            from faster_whisper import BatchedInferencePipeline, WhisperModel
+            workers = max(1, LOCAL_ASR_WORKERS)
+            with span("asr.load", model=LOCAL_ASR_MODEL):
+                # num_workers lets that many threads run the model at once, sharing the cores between them
+                model = WhisperModel(LOCAL_ASR_MODEL, device='cpu', compute_type=LOCAL_ASR_COMPUTE_TYPE,
+                                     cpu_threads=max(1, (os.cpu_count() or 1) // workers), num_workers=workers)
+            _local_asr_pipeline = BatchedInferencePipeline(model)
+            _local_asr_pid = os.getpid()
+        return _local_asr_pipeline
+
+class LocalWhisperBackend(TranscriptionBackend):
+    """Offline speech recognition with a quantized Whisper model on the CPU (faster-whisper)
+    
+    The segments of a batch are decoded together in one inference call. Speech in another language is
+    transcribed and then translated to English in a second pass, like the remote API returns it.
+    """
+    
+    name = "local"
+    
+    def __init__(self):
+        self.batch_size = max(1, LOCAL_ASR_BATCH_SIZE)
+        self.workers = max(1, LOCAL_ASR_WORKERS)
+    
+    def describe(self):
+        return f"local model '{LOCAL_ASR_MODEL}' ({self.workers} worker(s), {self.batch_size} segments per batch)"
+    
+    def _decode(self, pipeline, audio, clips, task, language=None):
+        """Run one batched pass over the clips, returning (text per clip, language)"""
+        segments, info = pipeline.transcribe(audio, task=task, language=language, clip_timestamps=clips,
+                                             batch_size=self.batch_size)
+        clip_starts = [clip["start"] for clip in clips]
+        texts = [[] for _ in clips]
+        for segment in segments:
+            # Output times are positions in the concatenated audio; the midpoint says which clip it came from
+            clip_index = max(0, bisect.bisect_right(clip_starts, (segment.start + segment.end) / 2) - 1)
+            texts[clip_index].append(segment.text.strip())
+        return [" ".join(text) for text in texts], info.language
+    
+    def transcribe(self, segments):
+        import numpy as np
+        try:
+            check_cancelled()
+            pipeline = get_local_asr_pipeline()
+            # The segments are laid end to end and passed as clips of one array
+            audio = np.concatenate([np.frombuffer(pcm, dtype='<i2') for _, _, _, pcm in segments]).astype(np.float32) / 32768.0
+            clips = []
+            offset = 0.0
+            for _, _, _, pcm in segments:
+                duration = len(pcm) / (SPEECH_SAMPLE_RATE * 2)
+                clips.append({"start": offset, "end": offset + duration})
+                offset += duration
+            
+            first_segment = segments[0][0] + 1
+            print(f"Transcribing segments {first_segment}-{segments[-1][0] + 1} with local model '{LOCAL_ASR_MODEL}'...")
+            with span("transcribe.batch", segment=first_segment, segments=len(segments), bytes=audio.nbytes // 2):
+                source_texts, language = self._decode(pipeline, audio, clips, 'transcribe')
+                if language == 'en':
+                    english_texts = source_texts
+                else:
+                    english_texts, _ = self._decode(pipeline, audio, clips, 'translate', language)
+        except Exception as e:
+            print(f"Error transcribing segments locally: {e}")
+            traceback.print_exc()
+            return [None] * len(segments)
         
-        # If we didn't get any results, return an error
-        if not segment_results:
-            return {"text": "Failed to process any segments of the audio file.", "method": "Error: Segmented Audio Processing"}
-        
-        # Combine all segment results
-        combined_text = f"Long Audio Processing Results (Processed in {num_segments} segments)\n"
-        combined_text += f"Total Duration: {total_duration:.2f} seconds\n"
-        combined_text += "-" * 80 + "\n\n"
-        
-        # Extract language information from the first successful segment
-        source_language = "unknown"
-        for result in segment_results:
-            if "from" in result["method"]:
-                # Extract language code from method string like "Sarvam AI Speech-to-Text-Translate (from hi-IN to English)"
-                method_parts = result["method"].split("from ")
-                if len(method_parts) > 1:
-                    language_part = method_parts[1].split(" to")[0]
-                    source_language = language_part
+        results = []
+        for (i, start_time, end_time, _), source_text, english_text in zip(segments, source_texts, english_texts):
+            if source_text.strip() or english_text.strip():
+                text = f"Original ({language}):\n{source_text}\n\nTranslated (English):\n{english_text}"
+                method = f"Local Whisper {LOCAL_ASR_MODEL} (from {language} to English)"
+            else:
+                text = "No speech was recognized in this segment."
+                method = f"Local Whisper {LOCAL_ASR_MODEL} (No text detected)"
+            results.append({"segment": i + 1, "start_time": start_time, "end_time": end_time, "text": text, "method": method})
+        return results
+
+class TranscriptionLoad:
+    """Seconds of audio currently being transcribed by each backend in this process"""
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.queued = collections.Counter()
+    
+    @contextlib.contextmanager
+    def reserve(self, backend_name, seconds):
+        with self.lock:
+            self.queued[backend_name] += seconds
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.queued[backend_name] -= seconds
+    
+    def seconds(self, backend_name):
+        with self.lock:
+            return self.queued[backend_name]
+
+transcription_load = TranscriptionLoad()
+
+def estimate_transcription_seconds(backend_name, duration):
+    """Estimate when a file of `duration` seconds would be transcribed by a backend, given the audio already queued on it"""
+    audio_seconds = transcription_load.seconds(backend_name) + duration
+    if backend_name == "local":
+        return audio_seconds * LOCAL_ASR_REALTIME_FACTOR
+    # Remote throughput is capped by the rate limit and by concurrent requests over their typical latency
+    latency = get_sarvam_client().stats().get("latency_p50", 2.0)
+    throughput = SARVAM_MAX_CONCURRENT_REQUESTS / max(latency, 0.001)
+    if SARVAM_REQUESTS_PER_SECOND > 0:
+        throughput = min(throughput, SARVAM_REQUESTS_PER_SECOND)
+    return audio_seconds / SEGMENT_LENGTH / max(throughput, 0.001) + latency
+
+# Name of the transcription backend chosen for the file being extracted, so its result is cached under it
+transcription_backend_used = contextvars.ContextVar('transcription_backend_used', default=None)
+
+def transcription_backend_candidates():
+    """Names of the backends TRANSCRIPTION_BACKEND can choose with the current setup, preferred first"""
+    if TRANSCRIPTION_BACKEND == 'local':
+        return ["local"]
+    if TRANSCRIPTION_BACKEND == 'sarvam' or not local_asr_available():
+        return ["sarvam"]
+    if not SARVAM_API_KEY:
+        return ["local"]
+    return ["sarvam", "local"]
+
+def choose_transcription_backend(duration):
+    """Pick the backend to transcribe a file with, as set by TRANSCRIPTION_BACKEND
+    
+    In "auto" mode the remote API is used unless it has no API key, or the local model (when installed)
+    is expected to finish this file sooner than the audio already queued for the API allows.
+    The choice is recorded in transcription_backend_used.
+    """
+    backend = _choose_transcription_backend(duration)
+    transcription_backend_used.set(backend.name)
+    return backend
+
+def _choose_transcription_backend(duration):
+    """The choice made by choose_transcription_backend(), without recording it"""
+    headers = {'api-subscription-key': SARVAM_API_KEY.strip()}
+    if TRANSCRIPTION_BACKEND == 'local':
+        return LocalWhisperBackend()
+    if TRANSCRIPTION_BACKEND == 'sarvam' or not local_asr_available():
+        return SarvamBackend(headers)
+    if not SARVAM_API_KEY:
+        print("No Sarvam AI API key set, transcribing with the local model")
+        return LocalWhisperBackend()
+    
+    local_estimate = estimate_transcription_seconds("local", duration)
+    remote_estimate = estimate_transcription_seconds("sarvam", duration)
+    print(f"Estimated transcription time: {remote_estimate:.0f}s remote, {local_estimate:.0f}s local")
+    if local_estimate < remote_estimate:
+        return LocalWhisperBackend()
+    return SarvamBackend(headers)
+
+def transcribe_short_pcm(file_path, backend):
+    """Transcribe a file of at most 30 seconds as a single segment, returning a {"text", "method"} result"""
+    pcm = b"".join(segment_pcm for _, _, _, segment_pcm in iter_pcm_segments(file_path))
+    result = backend.transcribe([(0, 0.0, len(pcm) / (SPEECH_SAMPLE_RATE * 2), pcm)])[0]
+    if result is None:
+        return {"text": "The audio could not be transcribed.", "method": f"Error: {backend.name} transcription"}
+    return {"text": result["text"], "method": result["method"]}
+
+def backend_unavailable_message(backend):
+    """Return the (text, method) to report when a backend cannot be used, or None when it can"""
+    if backend.name == "sarvam" and not SARVAM_API_KEY:
+        return ("Cannot process audio: Sarvam AI API key not set. Please set SARVAM_API_KEY environment variable.",
+                "Error: Missing API Key")
+    if backend.name == "local" and not local_asr_available():
+        return ("Cannot process audio: local speech recognition needs faster-whisper (pip install faster-whisper).",
+                "Error: Local Speech Recognition Unavailable")
+    return None
+
+def iter_pcm_segments(file_path, segment_length=SEGMENT_LENGTH, start_index=0, start_time=None):
+    """Decode an audio or video file once with ffmpeg and yield (index, start_time, end_time, pcm) segments
+    
+    The audio is streamed from ffmpeg as 16 kHz mono 16-bit PCM, so only one segment is held in memory at a time.
+    With start_index, ffmpeg seeks to that segment (or to start_time, if given) instead of decoding the
+    ones before it.
+    """
+    if start_time is None:
+        start_time = start_index * segment_length
+    command = [get_ffmpeg_binary(), '-v', 'error']
+    if start_time:
+        command += ['-ss', str(start_time)]
+    command += [
+        '-i', file_path,
+        '-vn', '-f', 's16le', '-acodec', 'pcm_s16le', '-ac', '1', '-ar', str(SPEECH_SAMPLE_RATE), '-'
+    ]
+    bytes_per_second = SPEECH_SAMPLE_RATE * 2
+    segment_bytes = int(segment_length * SPEECH_SAMPLE_RATE) * 2
+    
+    with tempfile.TemporaryFile() as error_log:
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=error_log)
+        try:
+            index = start_index
+            while True:
+                # read() blocks until a full segment is available or the stream ends
+                with span("decode", segment=index + 1) as decode_span:
+                    pcm = process.stdout.read(segment_bytes)
+                    decode_span.bytes = len(pcm)
+                if not pcm:
                     break
+                segment_start = start_time + (index - start_index) * segment_length
+                yield index, segment_start, segment_start + len(pcm) / bytes_per_second, pcm
+                index += 1
+            process.wait()
+        finally:
+            # Stop ffmpeg if the consumer gave up before the end of the stream
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            process.stdout.close()
         
-        # Combine all transcripts
+        if process.returncode != 0:
+            error_log.seek(0)
+            error_output = error_log.read().decode('utf-8', errors='replace').strip()
+            raise RuntimeError(f"ffmpeg could not decode {file_path}: {error_output}")
+
+def _mask_runs(mask):
+    """Return the (starts, ends) of the runs of True values in a boolean array"""
+    import numpy as np
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+def detect_speech_frames(samples):
+    """Classify VAD_FRAME_LENGTH frames of 16-bit PCM samples as speech or not
+    
+    Returns (voiced, energy_db): a boolean array with one entry per frame, after closing short pauses,
+    dropping short blips and padding, and the frames' RMS energy in dBFS.
+    """
+    import numpy as np
+    frame_length = int(VAD_FRAME_LENGTH * SPEECH_SAMPLE_RATE)
+    frame_count = -(-len(samples) // frame_length)
+    frames = np.zeros(frame_count * frame_length, dtype=np.float32)
+    frames[:len(samples)] = samples
+    frames = frames.reshape(frame_count, frame_length) / 32768.0
+    energy_db = 10 * np.log10(np.mean(frames * frames, axis=1) + 1e-10)
+    
+    # The quietest frames of the window give its noise floor; when the window is all speech they are speech
+    # too, so the threshold is also kept within VAD_PEAK_RANGE_DB of the loudest frame
+    noise_floor = np.percentile(energy_db, 10)
+    threshold = min(noise_floor + VAD_THRESHOLD_DB, energy_db.max() - VAD_PEAK_RANGE_DB)
+    voiced = energy_db > max(threshold, VAD_MIN_SPEECH_DBFS)
+    
+    # Pauses between words stay inside the speech around them
+    pause_starts, pause_ends = _mask_runs(~voiced)
+    for start, end in zip(pause_starts, pause_ends):
+        if 0 < start and end < frame_count and end - start < VAD_MIN_PAUSE / VAD_FRAME_LENGTH:
+            voiced[start:end] = True
+    
+    # Clicks and other short noises are not speech; what remains gets some margin on both sides
+    padding = int(round(VAD_PADDING / VAD_FRAME_LENGTH))
+    padded = np.zeros_like(voiced)
+    for start, end in zip(*_mask_runs(voiced)):
+        if end - start >= VAD_MIN_SPEECH / VAD_FRAME_LENGTH:
+            padded[max(0, start - padding):end + padding] = True
+    return padded, energy_db
+
+def choose_segment_cut(voiced, energy_db):
+    """Return the frame at which to end a segment that fills a whole window
+    
+    Cuts at the start of the last pause in the window, or if there is none at the quietest frame
+    of its last third, so words are not split.
+    """
+    import numpy as np
+    pause_starts, _ = _mask_runs(~voiced)
+    if len(pause_starts):
+        # The speech mask is already padded, so the segment can end where the pause starts
+        return int(pause_starts[-1])
+    # Without a pause, the quietest frame is most likely a gap between words
+    search_from = len(energy_db) * 2 // 3
+    return search_from + int(np.argmin(energy_db[search_from:]))
+
+def iter_speech_segments(file_path, start_index=0, start_time=0.0):
+    """Decode an audio or video file and yield (index, start_time, end_time, pcm) segments of speech only
+    
+    Silence is dropped and the speech is packed into segments of at most VAD_MAX_SEGMENT_LENGTH seconds
+    that end in pauses. Each segment only depends on the audio from the end of the previous one, so
+    resuming at the end time of an earlier segment yields the same segments after it.
+    """
+    import numpy as np
+    frame_length = int(VAD_FRAME_LENGTH * SPEECH_SAMPLE_RATE)
+    window = int(VAD_MAX_SEGMENT_LENGTH * SPEECH_SAMPLE_RATE) // frame_length * frame_length
+    blocks = iter_pcm_segments(file_path, start_time=start_time)
+    buffer = np.zeros(0, dtype=np.int16)
+    # Position of the start of the buffer in the file, in samples
+    offset = int(round(start_time * SPEECH_SAMPLE_RATE))
+    index = start_index
+    exhausted = False
+    
+    while True:
+        # Keep at least one full window of audio to look at
+        while not exhausted and len(buffer) < window:
+            try:
+                _, _, _, pcm = next(blocks)
+            except StopIteration:
+                exhausted = True
+                break
+            buffer = np.concatenate((buffer, np.frombuffer(pcm, dtype='<i2')))
+        if not len(buffer):
+            return
+        
+        with span("vad", segment=index + 1):
+            voiced, energy_db = detect_speech_frames(buffer[:window])
+        
+        if not voiced.any():
+            # Nothing but silence in this window
+            offset += min(window, len(buffer))
+            buffer = buffer[window:]
+            continue
+        
+        first_voiced = int(np.argmax(voiced)) * frame_length
+        if first_voiced:
+            # Drop the leading silence, then look at a full window starting with the speech
+            offset += first_voiced
+            buffer = buffer[first_voiced:]
+            continue
+        
+        last_segment = exhausted and len(buffer) <= window
+        if last_segment:
+            # The rest of the file fits in one segment; leave out its trailing silence
+            segment_end = min(len(buffer), (len(voiced) - int(np.argmax(voiced[::-1]))) * frame_length)
+        else:
+            segment_end = choose_segment_cut(voiced, energy_db) * frame_length
+        
+        segment = buffer[:segment_end]
+        yield index, offset / SPEECH_SAMPLE_RATE, (offset + len(segment)) / SPEECH_SAMPLE_RATE, segment.tobytes()
+        if last_segment:
+            return
+        index += 1
+        offset += segment_end
+        buffer = buffer[segment_end:]
+
+def iter_audio_segments(file_path, start_index=0, start_time=0.0):
+    """Yield the (index, start_time, end_time, pcm) segments of a file to transcribe, as set by AUDIO_SEGMENTATION"""
+    if AUDIO_SEGMENTATION == 'vad':
+        return iter_speech_segments(file_path, start_index, start_time)
+    return iter_pcm_segments(file_path, start_index=start_index, start_time=start_time)
+
+def pcm_to_wav_bytes(pcm):
+    """Wrap raw 16 kHz mono 16-bit PCM in an in-memory WAV file"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(SPEECH_SAMPLE_RATE)
+        wav_file.writeframes(pcm)
+    return buffer.getvalue()
+
+def process_long_audio(file_path, content_type, headers, total_duration=None):
+    """Process longer audio files (>30 seconds) by splitting them into segments of up to 30 seconds
+    
+    Pass total_duration when it is already known to avoid opening the file again.
+    """
+    return ExtractionStream(stream_long_audio(file_path, SarvamBackend(headers), total_duration)).collect()
+
+def iter_audio_segment_results(file_path, backend, expected_segments, job=None):
+    """Transcribe the segments of an audio or video file, yielding (start_time, end_time, result) in segment order
+    
+    Segments are cut from a single ffmpeg decode and handed to the backend in batches of its batch size,
+    which are transcribed concurrently while decoding continues. Each result is yielded as soon as it and
+    all earlier segments are done, and is None for a segment that could not be transcribed.
+    
+    With a SegmentJob, segments completed by an earlier run are reused instead of being sent again,
+    and every newly transcribed segment is checkpointed to the job.
+    """
+    completed = job.completed if job else {}
+    progress = ProgressCounter(expected_segments, "segments")
+    
+    if job and job.total_segments is not None and all(i in completed for i in range(job.total_segments)):
+        print(f"All {job.total_segments} segments were transcribed by an earlier run")
+        for i in range(job.total_segments):
+            progress.advance()
+            yield completed[i]["start_time"], completed[i]["end_time"], completed[i]
+        return
+    
+    # Decoding starts at the first segment that is still missing
+    start_index = 0
+    while start_index in completed:
+        progress.advance()
+        yield completed[start_index]["start_time"], completed[start_index]["end_time"], completed[start_index]
+        start_index += 1
+    # Segments are contiguous, so decoding resumes where the last reused one ended
+    resume_time = completed[start_index - 1]["end_time"] if start_index else 0.0
+    if completed:
+        print(f"Resuming at segment {start_index + 1}: {len(completed)} segments were transcribed by an earlier run")
+    
+    batch_size = max(1, backend.batch_size)
+    workers = max(1, min(backend.workers, -(-(expected_segments - len(completed)) // batch_size)))
+    print(f"Transcribing with {backend.describe()}")
+    
+    # Limit how many decoded segments can wait in memory for a free worker
+    pending_segments = threading.BoundedSemaphore(workers * batch_size * 2)
+    futures = collections.deque()
+    batch = []
+    segment_count = start_index
+    
+    def segment_done(future):
+        pending_segments.release()
+        progress.advance()
+        if job and not future.cancelled() and future.exception() is None:
+            result = future.result()
+            # Segments the API rejected are retried on the next run
+            if result is not None and not result["method"].startswith("Error"):
+                job.record_segment(result["segment"] - 1, result)
+    
+    def transcribe_batch(segments):
+        # Segments whose futures were cancelled because the consumer stopped are left out
+        segments = [(segment, future) for segment, future in segments if future.set_running_or_notify_cancel()]
+        if not segments:
+            return
+        try:
+            results = backend.transcribe([segment for segment, _ in segments])
+        except BaseException as e:
+            for _, future in segments:
+                future.set_exception(e)
+            raise
+        for (_, future), result in zip(segments, results):
+            future.set_result(result)
+    
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        try:
+            for i, start_time, end_time, pcm in iter_audio_segments(file_path, start_index, resume_time):
+                check_cancelled()
+                future = Future()
+                if i in completed:
+                    future.set_result(completed[i])
+                    progress.advance()
+                else:
+                    pending_segments.acquire()
+                    future.add_done_callback(segment_done)
+                    batch.append(((i, start_time, end_time, pcm), future))
+                    if len(batch) == batch_size:
+                        submit_in_context(executor, transcribe_batch, batch)
+                        batch = []
+                futures.append((start_time, end_time, future))
+                segment_count = i + 1
+                # Pause-based cutting can produce more segments than the estimate
+                if segment_count > progress.total:
+                    progress.set_total(segment_count)
+                
+                # Hand over the segments at the head of the queue that are already transcribed
+                while futures and futures[0][2].done():
+                    start, end, done = futures.popleft()
+                    yield start, end, done.result()
+            
+            if batch:
+                submit_in_context(executor, transcribe_batch, batch)
+                batch = []
+            if job:
+                job.record_total(segment_count)
+            progress.set_total(segment_count)
+            
+            while futures:
+                start, end, pending = futures.popleft()
+                yield start, end, pending.result()
+        finally:
+            # If the consumer stops early, do not send the segments that are still queued
+            for _, _, pending in futures:
+                pending.cancel()
+
+def stream_long_audio(file_path, backend, total_duration=None):
+    """Yield the transcript of a long audio file segment by segment, returning the extraction method at the end"""
+    print("Audio is longer than 30 seconds. Processing in smaller segments...")
+    
+    try:
+        # First, verify that the file exists
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"Audio file not found: {file_path}")
+        
+        if total_duration is None:
+            total_duration = get_audio_duration(file_path)
+        
+        # Estimate the number of segments we'll need to process
+        segment_length = SEGMENT_LENGTH
+        expected_segments = int(total_duration / segment_length) + (1 if total_duration % segment_length > 0 else 0)
+        
+        print(f"Total audio duration: {total_duration:.2f} seconds")
+        if AUDIO_SEGMENTATION == 'vad':
+            # Silence is dropped but segments are cut at pauses, so the actual count can be lower or higher
+            print(f"Processing speech in segments of at most {VAD_MAX_SEGMENT_LENGTH} seconds each, cut at pauses")
+        else:
+            print(f"Processing in {expected_segments} segments of approximately {segment_length} seconds each")
+        
+        # Segments finished by an interrupted earlier run of the same file are not transcribed again
+        try:
+            job = segment_checkpoints.open_job(file_path, backend.name)
+        except Exception as e:
+            print(f"Warning: Segment checkpoints unavailable: {e}")
+            job = None
+        
+        num_segments = 0
+        processed_segments = 0
+        failed_segments = 0
+        source_language = None
         original_transcripts = []
         english_transcripts = []
         
-        for i, result in enumerate(segment_results):
-            segment_num = i + 1
-            start_time = result["start_time"]
-            end_time = result["end_time"]
-            segment_text = result["text"]
+        for start_time, end_time, result in iter_audio_segment_results(file_path, backend, expected_segments, job):
+            num_segments += 1
+            # Drop segments that could not be processed
+            if result is None:
+                failed_segments += 1
+                continue
+            if result["method"].startswith("Error"):
+                failed_segments += 1
+            
+            # The header goes out with the first segment that has a transcript
+            if not processed_segments:
+                yield ("Long Audio Processing Results\n"
+                       f"Total Duration: {total_duration:.2f} seconds\n"
+                       + "-" * 80 + "\n\n")
+            processed_segments += 1
             
-            combined_text += f"SEGMENT {segment_num} ({start_time:.2f}s - {end_time:.2f}s):\n"
-            combined_text += "-" * 40 + "\n"
-            combined_text += segment_text + "\n\n"
+            # Extract language code from method string like "Sarvam AI Speech-to-Text-Translate (from hi-IN to English)"
+            segment_language = "unknown"
+            method_parts = result["method"].split("from ")
+            if len(method_parts) > 1:
+                segment_language = method_parts[1].split(" to")[0]
+                if source_language is None:
+                    source_language = segment_language
+            
+            segment_text = result["text"]
+            yield (f"SEGMENT {result['segment']} ({start_time:.2f}s - {end_time:.2f}s):\n"
+                   + "-" * 40 + "\n"
+                   + segment_text + "\n\n")
             
             # Try to extract original and translated text for later combination
             if "Original" in segment_text and "Translated" in segment_text:
                 parts = segment_text.split("\n\n")
                 if len(parts) >= 2:
-                    original_part = parts[0].replace(f"Original ({source_language}):", "").strip()
-                    translated_part = parts[1].replace("Translated (English):", "").strip()
-                    
-                    original_transcripts.append(original_part)
-                    english_transcripts.append(translated_part)
+                    original_transcripts.append(parts[0].replace(f"Original ({segment_language}):", "").strip())
+                    english_transcripts.append(parts[1].replace("Translated (English):", "").strip())
+        
+        if not num_segments:
+            yield "No speech was detected in the audio file."
+            return "Error: No speech detected"
+        
+        # If we didn't get any results, return an error
+        if not processed_segments:
+            yield "Failed to process any segments of the audio file."
+            return "Error: Segmented Audio Processing"
+        
+        source_language = source_language or "unknown"
+        
+        # Once every segment has been transcribed the result goes to the extraction cache instead
+        if job and all(i in job.completed for i in range(num_segments)):
+            job.finish()
         
         # Add combined transcript at the end if we have both original and translations
         if original_transcripts and english_transcripts:
-            combined_text += "\n" + "=" * 80 + "\n"
-            combined_text += "COMBINED TRANSCRIPT\n"
-            combined_text += "=" * 80 + "\n\n"
-            
-            combined_text += f"Original ({source_language}):\n"
-            combined_text += " ".join(original_transcripts) + "\n\n"
-            
-            combined_text += "Translated (English):\n"
-            combined_text += " ".join(english_transcripts)
+            yield ("\n" + "=" * 80 + "\n"
+                   + "COMBINED TRANSCRIPT\n"
+                   + "=" * 80 + "\n\n"
+                   + f"Original ({source_language}):\n"
+                   + " ".join(original_transcripts) + "\n\n"
+                   + "Translated (English):\n"
+                   + " ".join(english_transcripts))
+        
+        yield f"\n\n[Processed in {num_segments} segments]\n"
+        
+        if failed_segments:
+            # An error method keeps the partial transcript out of the extraction cache, so the next run
+            # resumes from the checkpoints and retries only the failed segments
+            yield f"[Incomplete: {failed_segments} of {num_segments} segments could not be transcribed]\n"
+            return f"Error: Partial Transcript ({failed_segments} of {num_segments} segments failed, from {source_language} to English)"
         
-        return {"text": combined_text, "method": f"Segmented Audio Processing ({num_segments} segments, from {source_language} to English)"}
+        return f"Segmented Audio Processing ({num_segments} segments, from {source_language} to English)"
     
     except Exception as e:
         error_message = f"Error processing long audio file: {str(e)}"
         print(error_message)
         traceback_info = traceback.format_exc()
         print(traceback_info)
-        return {"text": error_message, "method": "Error: Long Audio Processing"}
+        yield error_message
+        return "Error: Long Audio Processing"
 
 def extract_text_from_video(file_path):
-    """Extract text from a video file by extracting audio and processing it"""
-    temp_audio_path = None
+    """Extract text from a video file: the transcript of its audio track and the text of the slides shown in it
     
+    The soundtrack is decoded straight to 16 kHz mono segments, so no intermediate WAV file is written
+    and the first segment is transcribed while the rest of the video is still being decoded.
+    Slides are found and OCR'd while the audio is being transcribed.
+    """
+    return ExtractionStream(stream_video_text(file_path)).collect()
+
+# Audio results that mean there is nothing to transcribe rather than that transcription failed
+VIDEO_SILENT_METHODS = ("Error: No Audio Track", "Error: No speech detected")
+
+def stream_video_text(file_path):
+    """Yield the transcript of a video's audio track as it is produced, then the text of its slides,
+    returning the extraction method at the end"""
+    slide_executor = None
+    stop_slides = threading.Event()
     try:
         print(f"Processing video file: {file_path}")
         
-        # Create a temporary file for the extracted audio
-        with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_audio_file:
-            temp_audio_path = temp_audio_file.name
-        
-        # Extract audio from video using moviepy
-        print("Extracting audio from video...")
-        video = VideoFileClip(file_path)
-        video.audio.write_audiofile(temp_audio_path, codec='pcm_s16le')
-        video.close()
+        # Read the duration from the container header without decoding anything
+        from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+        with span("probe"):
+            video_info = ffmpeg_parse_infos(file_path)
         
-        # Check the duration of the extracted audio
-        audio_duration = get_audio_duration(temp_audio_path)
-        print(f"Extracted audio duration: {audio_duration:.2f} seconds")
+        # Slides are sampled and OCR'd in the background while the audio is transcribed
+        slides = None
+        if VIDEO_SLIDE_OCR and video_info.get('video_found'):
+            slide_executor = ThreadPoolExecutor(max_workers=1)
+            slides = submit_in_context(slide_executor, extract_video_slides, file_path, video_info, stop_slides)
         
-        # Process the extracted audio
-        print(f"Audio extracted to {temp_audio_path}, now processing...")
+        method = yield from stream_video_audio(file_path, video_info)
+        if slides is None:
+            return method
         
-        # Process directly with appropriate API based on duration
-        if not SARVAM_API_KEY:
-            return {"text": "Cannot process audio: Sarvam AI API key not set. Please set SARVAM_API_KEY environment variable.", 
-                    "method": "Error: Missing API Key"}
-        
-        # Prepare the API request with the correct header format
-        headers = {
-            'api-subscription-key': SARVAM_API_KEY.strip()
-        }
-        content_type = 'audio/wav'
+        try:
+            slide_texts, sampled_frames = slides.result()
+        except Exception as e:
+            # The transcript has already been streamed, so keep it
+            print(f"Warning: Slide OCR failed: {e}")
+            traceback.print_exc()
+            return method
+        print(f"Slide OCR: {len(slide_texts)} distinct slides in {sampled_frames} sampled frames")
+        if not slide_texts:
+            return method
         
-        # Use appropriate API based on duration
-        if audio_duration <= 30:
-            audio_extraction_result = process_short_audio(temp_audio_path, content_type, headers)
-        else:
-            audio_extraction_result = process_long_audio(temp_audio_path, content_type, headers)
+        # Say in the text why there is no transcript above the slides; a partial transcript already ends with its own note
+        audio_failed = method.startswith("Error") and method not in VIDEO_SILENT_METHODS
+        if audio_failed and not method.startswith("Error: Partial Transcript"):
+            yield f"\n\n[Audio not transcribed: {method[len('Error: '):]}]"
         
-        # Add info that this was extracted from a video
-        if "Error" not in audio_extraction_result["method"]:
-            audio_extraction_result["method"] = f"Video Audio: {audio_extraction_result['method']}"
+        yield ("\n\n" + "=" * 80 + "\n"
+               + f"SLIDE TEXT ({len(slide_texts)} distinct slides)\n"
+               + "=" * 80 + "\n\n")
+        for number, (frame_time, text) in enumerate(slide_texts, start=1):
+            yield (f"SLIDE {number} ({frame_time:.2f}s):\n"
+                   + "-" * 40 + "\n"
+                   + text + "\n\n")
         
-        return audio_extraction_result
+        slide_method = f"Slide OCR ({len(slide_texts)} slides)"
+        if method in VIDEO_SILENT_METHODS:
+            return f"Video {slide_method}"
+        # Any other audio failure keeps its error method, so the result is not cached and the audio is retried
+        return f"{method} + {slide_method}"
     
     except Exception as e:
         error_message = f"Error extracting text from video: {str(e)}"
         print(error_message)
-        import traceback
         traceback.print_exc()
-        return {"text": error_message, "method": "Error: Video Processing"}
+        yield error_message
+        return "Error: Video Processing"
+    finally:
+        # Stop the slide OCR if the consumer gave up or the transcription failed
+        stop_slides.set()
+        if slide_executor is not None:
+            slide_executor.shutdown(wait=False)
+
+def stream_video_audio(file_path, video_info):
+    """Yield the transcript of a video's audio track as it is produced, returning the extraction method at the end"""
+    # Process directly with appropriate API based on duration
+    if not video_info.get('audio_found'):
+        yield "This video has no audio track to transcribe."
+        return "Error: No Audio Track"
+    audio_duration = video_info.get('duration') or 31
+    print(f"Video duration: {audio_duration:.2f} seconds")
+    
+    backend = choose_transcription_backend(audio_duration)
+    unavailable = backend_unavailable_message(backend)
+    if unavailable:
+        yield unavailable[0]
+        return unavailable[1]
+    
+    # Use appropriate API based on duration
+    if audio_duration > 30:
+        audio_chunks = stream_long_audio(file_path, backend, total_duration=audio_duration)
+    elif backend.name == "sarvam":
+        pcm = b"".join(segment_pcm for _, _, _, segment_pcm in iter_pcm_segments(file_path))
+        upload_name = os.path.splitext(os.path.basename(file_path))[0] + ".wav"
+        audio_chunks = stream_result(process_short_audio(upload_name, 'audio/wav', backend.headers, audio_data=pcm_to_wav_bytes(pcm)))
+    else:
+        audio_chunks = stream_result(transcribe_short_pcm(file_path, backend))
+    with transcription_load.reserve(backend.name, audio_duration):
+        method = yield from audio_chunks
+    
+    # Add info that this was extracted from a video
+    if "Error" not in method:
+        method = f"Video Audio: {method}"
+    
+    return method
+
+def video_frame_size(video_info):
+    """(width, height) to decode a video's frames at: its displayed size, at most VIDEO_FRAME_MAX_WIDTH wide"""
+    width, height = video_info['video_size']
+    # ffmpeg applies the rotation tag when decoding, so portrait phone recordings come out rotated
+    if video_info.get('video_rotation') in (90, 270):
+        width, height = height, width
+    if width > VIDEO_FRAME_MAX_WIDTH:
+        height = height * VIDEO_FRAME_MAX_WIDTH // width
+        width = VIDEO_FRAME_MAX_WIDTH
+    return max(2, width // 2 * 2), max(2, height // 2 * 2)
+
+def iter_video_frames(file_path, width, height):
+    """Decode a video once with ffmpeg and yield (time, frame) for VIDEO_FRAME_RATE frames per second
+    
+    Frames are streamed from ffmpeg as 8-bit grayscale and returned as PIL images of the given size.
+    """
+    from PIL import Image
+    command = [
+        get_ffmpeg_binary(), '-v', 'error', '-i', file_path,
+        '-an', '-sn', '-vf', f'fps={VIDEO_FRAME_RATE},scale={width}:{height}',
+        '-f', 'rawvideo', '-pix_fmt', 'gray', '-'
+    ]
+    frame_bytes = width * height
+    
+    with tempfile.TemporaryFile() as error_log:
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=error_log)
+        try:
+            index = 0
+            while True:
+                with span("decode.frame", frame=index + 1) as decode_span:
+                    data = process.stdout.read(frame_bytes)
+                    decode_span.bytes = len(data)
+                if len(data) < frame_bytes:
+                    break
+                yield index / VIDEO_FRAME_RATE, Image.frombytes('L', (width, height), data)
+                index += 1
+            process.wait()
+        finally:
+            # Stop ffmpeg if the consumer gave up before the end of the stream
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            process.stdout.close()
+        
+        if process.returncode != 0:
+            error_log.seek(0)
+            error_output = error_log.read().decode('utf-8', errors='replace').strip()
+            raise RuntimeError(f"ffmpeg could not decode the frames of {file_path}: {error_output}")
+
+def frame_hash(frame):
+    """Perceptual difference hash of a frame, as an int
+    
+    The frame is shrunk to a VIDEO_HASH_SIZE grid; each pair of horizontally adjacent cells sets one bit
+    if the right cell is clearly brighter and another if it is clearly darker, so flat areas and
+    compression noise set no bits at all.
+    """
+    import numpy as np
+    from PIL import Image
+    cells = np.asarray(frame.resize((VIDEO_HASH_SIZE + 1, VIDEO_HASH_SIZE), Image.BOX), dtype=np.int16)
+    steps = cells[:, 1:] - cells[:, :-1]
+    bits = np.concatenate(((steps > 4).ravel(), (steps < -4).ravel()))
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+def hash_distance(first, second):
+    """Fraction of the bits set in either hash that differ, 0 for two identical (or blank) frames"""
+    union = bin(first | second).count('1')
+    if not union:
+        return 0.0
+    return bin(first ^ second).count('1') / union
+
+def iter_keyframes(frames):
+    """Yield the (time, frame) of every distinct slide among sampled video frames
+    
+    A frame is a keyframe when the scene has settled, that is when the next sampled frame looks the same,
+    and it is not a near-duplicate of an earlier keyframe, so a slide that is shown again later or
+    stays on screen for minutes is still only OCR'd once. The last frame is taken without waiting.
+    """
+    keyframe_hashes = []
+    previous = None
+    
+    def is_new(frame_hash_value):
+        return all(hash_distance(frame_hash_value, seen) > VIDEO_DUPLICATE_DISTANCE for seen in keyframe_hashes)
+    
+    for frame_time, frame in frames:
+        current = (frame_time, frame, frame_hash(frame))
+        if previous is not None and hash_distance(current[2], previous[2]) <= VIDEO_DUPLICATE_DISTANCE and is_new(previous[2]):
+            keyframe_hashes.append(previous[2])
+            yield previous[0], previous[1]
+        previous = current
+    if previous is not None and is_new(previous[2]):
+        yield previous[0], previous[1]
+
+def ocr_slide(frame):
+    """OCR one video frame through the image path, returning its text"""
+    languages = TESSERACT_LANGUAGES if TESSERACT_OCR_MODE != 'script' else None
+    text, _ = recognize_image(frame, languages)
+    return text.strip()
+
+def extract_video_slides(file_path, video_info, stop_event=None):
+    """OCR the distinct slides of a video, returning ([(time, text)], number of sampled frames)
+    
+    Keyframes are OCR'd in parallel while ffmpeg decodes the rest of the video; at most two per
+    OCR worker are waiting at a time. Slides without text are left out.
+    """
+    width, height = video_frame_size(video_info)
+    workers = max(1, OCR_TILE_WORKERS)
+    pending = collections.deque()
+    slide_texts = []
+    sampled_frames = 0
+    
+    def sampled(frames):
+        nonlocal sampled_frames
+        for frame_time, frame in frames:
+            check_cancelled()
+            if stop_event is not None and stop_event.is_set():
+                return
+            sampled_frames += 1
+            yield frame_time, frame
+    
+    def collect_oldest():
+        frame_time, future = pending.popleft()
+        text = future.result()
+        if text:
+            slide_texts.append((frame_time, text))
+    
+    with span("video.slides", bytes=os.path.getsize(file_path)):
+        frames = iter_video_frames(file_path, width, height)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            try:
+                keyframes = 0
+                for frame_time, frame in iter_keyframes(sampled(frames)):
+                    if keyframes >= VIDEO_MAX_SLIDES:
+                        print(f"Slide OCR stopped at {VIDEO_MAX_SLIDES} slides")
+                        break
+                    keyframes += 1
+                    pending.append((frame_time, submit_in_context(executor, ocr_slide, frame)))
+                    while len(pending) > workers * 2:
+                        collect_oldest()
+                while pending:
+                    collect_oldest()
+            finally:
+                frames.close()
+                for _, future in pending:
+                    future.cancel()
+    return slide_texts, sampled_frames
+
+def extract_text_from_archive(file_path):
+    """Extract the text of every file in a ZIP or TAR archive into one result with a section per file"""
+    return ExtractionStream(stream_archive_text(file_path)).collect()
+
+def iter_archive_members(file_path):
+    """Yield (name, file object, skip reason) for the files of a ZIP or TAR archive, in archive order
+    
+    ZIP members are listed from the central directory; TAR archives, compressed or not, are read as a
+    stream, so a member's file object is only valid until the next member is requested.
+    The file object is None for members that cannot be read, with the reason why.
+    """
+    if zipfile.is_zipfile(file_path):
+        with zipfile.ZipFile(file_path) as archive:
+            for info in archive.infolist():
+                if info.is_dir():
+                    continue
+                if info.flag_bits & 0x1:
+                    yield info.filename, None, "encrypted"
+                    continue
+                with archive.open(info) as member:
+                    yield info.filename, member, None
+    else:
+        with tarfile.open(file_path, mode='r|*') as archive:
+            for info in archive:
+                # Links and device files have no content of their own
+                if info.isfile():
+                    name = info.name[2:] if info.name.startswith('./') else info.name
+                    yield name, archive.extractfile(info), None
+
+def extract_archive_member(member_path):
+    """Extract a file copied out of an archive with the extractor for its type, deleting the copy afterwards
     
+    Returns (file_type, {"text", "method"}).
+    """
+    try:
+        member_type = detect_file_type(member_path)
+        if member_type == "Archive":
+            return member_type, {"text": "Archives inside archives are not extracted.", "method": "Error: Nested Archive"}
+        if member_type == "Unknown":
+            return member_type, {"text": "Unsupported file type.", "method": "Unknown"}
+        return member_type, extract_text(member_path, member_type)
     finally:
-        # Clean up temporary file if one was created
-        if temp_audio_path and os.path.exists(temp_audio_path):
+        try:
+            os.remove(member_path)
+        except FileNotFoundError:
+            pass
+
+def stream_archive_text(file_path):
+    """Yield the text of the files in a ZIP or TAR archive, one section per file, returning the extraction method at the end
+    
+    Members are copied out one at a time and extracted in parallel; the sections come out in archive
+    order as they complete. At most two members per worker are waiting on disk at a time.
+    """
+    work_dir = None
+    executor = None
+    try:
+        print(f"Processing archive: {file_path}")
+        work_dir = tempfile.mkdtemp(prefix="archive_")
+        workers = max(1, ARCHIVE_MEMBER_WORKERS)
+        executor = ThreadPoolExecutor(max_workers=workers)
+        
+        pending = collections.deque()
+        member_types = collections.Counter()
+        member_count = 0
+        extracted_count = 0
+        total_bytes = 0
+        limit_note = None
+        
+        def finished_sections(max_pending):
+            # Yield the sections of the oldest members that are done, waiting while more than max_pending are left
+            nonlocal extracted_count
+            while pending and (len(pending) > max_pending or pending[0][2].done()):
+                number, name, future = pending.popleft()
+                member_type, result = future.result()
+                if not result["method"].startswith("Error") and result["method"] not in ("Unknown", "Skipped"):
+                    extracted_count += 1
+                    member_types[member_type] += 1
+                yield (f"FILE {number}: {name} ({member_type}, {result['method']})\n"
+                       + "-" * 40 + "\n"
+                       + result["text"].strip() + "\n\n")
+        
+        for name, member, skip_reason in iter_archive_members(file_path):
+            base_name = os.path.basename(name.rstrip('/'))
+            if name.startswith('__MACOSX/') or base_name in ARCHIVE_IGNORED_NAMES:
+                continue
+            check_cancelled()
+            if member_count >= ARCHIVE_MAX_MEMBERS:
+                limit_note = f"only the first {ARCHIVE_MAX_MEMBERS} files were extracted"
+                break
+            member_count += 1
+            
+            if member is None:
+                done = Future()
+                done.set_result(("Skipped", {"text": f"Skipped: {skip_reason}.", "method": "Skipped"}))
+                pending.append((member_count, name, done))
+                continue
+            
+            # Keep the extension, which detect_file_type falls back to
+            member_path = os.path.join(work_dir, f"{member_count}{os.path.splitext(base_name)[1][:16]}")
+            with span("archive.copy", member=name) as copy_span, open(member_path, 'wb') as f:
+                # Count the bytes actually decompressed rather than trusting the sizes the archive declares
+                for chunk in iter(lambda: member.read(1024 * 1024), b''):
+                    total_bytes += len(chunk)
+                    if total_bytes > ARCHIVE_MAX_BYTES:
+                        break
+                    f.write(chunk)
+                copy_span.bytes = f.tell()
+            if total_bytes > ARCHIVE_MAX_BYTES:
+                os.remove(member_path)
+                member_count -= 1
+                limit_note = f"extraction stopped after {ARCHIVE_MAX_BYTES // (1024 * 1024)} MB of uncompressed data"
+                break
+            
+            pending.append((member_count, name, submit_in_context(executor, extract_archive_member, member_path)))
+            yield from finished_sections(workers * 2)
+        
+        yield from finished_sections(0)
+        
+        if limit_note:
+            print(f"Archive limit reached: {limit_note}")
+            yield f"[Archive truncated: {limit_note}]\n"
+        if not member_count:
+            yield "The archive contains no files."
+            return "Error: Empty Archive"
+        if not extracted_count:
+            return f"Error: Archive ({member_count} files, no text extracted)"
+        
+        summary = ", ".join(f"{count} {member_type}" for member_type, count in member_types.most_common())
+        method = f"Archive ({extracted_count} of {member_count} files extracted: {summary})"
+        if limit_note:
+            method += " (truncated)"
+        return method
+    
+    except Exception as e:
+        error_message = f"Error extracting archive: {str(e)}"
+        print(error_message)
+        traceback.print_exc()
+        yield error_message
+        return "Error: Archive Processing"
+    finally:
+        # On cancellation, or when the consumer stops early, drop the members that have not started yet
+        # and let the running ones finish before their files are removed
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+        if work_dir is not None:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+def file_content_hash(file_path):
+    """Return the SHA-256 hex digest of a file's content"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def extraction_settings(file_type, backend=None):
+    """Settings that change the output of the extractor for a file type, used in cache keys
+    
+    Audio and video settings are those of one transcription backend ("sarvam" or "local"), by default
+    the first one TRANSCRIPTION_BACKEND would choose.
+    """
+    if file_type in ("Image", "PDF"):
+        # Scanned PDF pages go through the same OCR path as images
+        return {
+            "languages": TESSERACT_LANGUAGES,
+            "psm": TESSERACT_PSM,
+            "mode": TESSERACT_OCR_MODE,
+            "engine": ocr_engine_name(),
+            "preprocess": [OCR_TARGET_DPI, OCR_MAX_DIMENSION, OCR_BINARIZE, OCR_TILE_HEIGHT]
+        }
+    elif file_type in ("Audio", "Video"):
+        backend = backend or transcription_backend_candidates()[0]
+        settings = {"model": SARVAM_MODEL, "segment_length": SEGMENT_LENGTH, "segmentation": AUDIO_SEGMENTATION,
+                    "backend": backend}
+        if backend == 'local':
+            settings["local_model"] = [LOCAL_ASR_MODEL, LOCAL_ASR_COMPUTE_TYPE]
+        if AUDIO_SEGMENTATION == 'vad':
+            settings["vad"] = [VAD_MAX_SEGMENT_LENGTH, VAD_THRESHOLD_DB, VAD_PEAK_RANGE_DB, VAD_MIN_SPEECH_DBFS, VAD_MIN_PAUSE, VAD_MIN_SPEECH, VAD_PADDING]
+        if file_type == "Video" and VIDEO_SLIDE_OCR:
+            settings["slides"] = [VIDEO_FRAME_RATE, VIDEO_FRAME_MAX_WIDTH, VIDEO_HASH_SIZE, VIDEO_DUPLICATE_DISTANCE, VIDEO_MAX_SLIDES]
+            settings["ocr"] = extraction_settings("Image")
+        return settings
+    return {}
+
+class ExtractionCache:
+    """Persistent extraction results keyed by file content hash, extraction type and settings
+    
+    Entries are JSON files in cache_dir. Reading an entry refreshes its modification time,
+    and the least recently used entries are deleted once the cache grows beyond max_bytes.
+    """
+    
+    # Only cache types where extraction is expensive (OCR, PDF parsing, paid API calls)
+    CACHED_TYPES = ("PDF", "Image", "Audio", "Video")
+    
+    def __init__(self, cache_dir, max_bytes):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+    
+    def keys_for(self, file_path, file_type):
+        """Build the cache keys for a file, or None if this type is not cached
+        
+        Audio and video results are keyed by the transcription backend that produced them, so these
+        get one key per backend TRANSCRIPTION_BACKEND can choose; other types get a single key under None.
+        """
+        if file_type not in self.CACHED_TYPES or self.max_bytes <= 0:
+            return None
+        content_hash = file_content_hash(file_path)
+        backends = transcription_backend_candidates() if file_type in ("Audio", "Video") else [None]
+        keys = {}
+        for backend in backends:
+            key_data = {
+                "version": EXTRACTION_CACHE_VERSION,
+                "content": content_hash,
+                "type": file_type,
+                "settings": extraction_settings(file_type, backend)
+            }
+            keys[backend] = hashlib.sha256(json.dumps(key_data, sort_keys=True).encode('utf-8')).hexdigest()
+        return keys
+    
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+    
+    def get(self, *keys):
+        """Return the cached {"text", "method"} result for the first of the keys that has one, or None"""
+        for key in keys:
+            entry_path = self._entry_path(key)
             try:
-                os.unlink(temp_audio_path)
-                print(f"Cleaned up temporary file: {temp_audio_path}")
-            except Exception as cleanup_error:
-                print(f"Warning: Failed to delete temporary audio file: {cleanup_error}")
+                with open(entry_path, 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+                # Mark the entry as recently used
+                os.utime(entry_path)
+            except (OSError, ValueError):
+                continue
+            
+            with self.lock:
+                self.hits += 1
+            return {"text": entry["text"], "method": entry["method"]}
+        
+        with self.lock:
+            self.misses += 1
+        return None
+    
+    def put(self, key, extraction_result):
+        """Store a result and evict old entries if the cache is over its size limit"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        entry_path = self._entry_path(key)
+        
+        # Write to a temporary file first so concurrent readers never see a partial entry
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({"text": extraction_result["text"], "method": extraction_result["method"]}, f, ensure_ascii=False)
+            os.replace(temp_path, entry_path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+        
+        self.evict()
+    
+    def evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes"""
+        entries = []
+        total_size = 0
+        with os.scandir(self.cache_dir) as scan:
+            for entry in scan:
+                if entry.name.endswith('.json') and entry.is_file():
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total_size += stat.st_size
+        
+        if total_size <= self.max_bytes:
+            return
+        
+        entries.sort()
+        for _, size, path in entries:
+            if total_size <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+                total_size -= size
+            except OSError:
+                # Another process may have evicted it already
+                pass
+    
+    def stats(self):
+        """Return hit/miss counters for this process"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+extraction_cache = ExtractionCache(EXTRACTION_CACHE_DIR, EXTRACTION_CACHE_MAX_BYTES)
 
-def extract_text(file_path, file_type):
-    """Extract text based on file type"""
+class SegmentCheckpoints:
+    """Per-segment results of long audio transcriptions, kept in a JSON job file until the job completes
+    
+    Jobs are keyed by the content hash of the file and segments by their index, so re-running an interrupted
+    file (even under another name) only transcribes the segments that failed or were never reached. Every
+    update re-reads the file under a lock, so batch worker processes can share it.
+    """
+    
+    def __init__(self, jobs_file):
+        self.jobs_file = jobs_file
+        self.lock = threading.Lock()
+    
+    @contextlib.contextmanager
+    def _locked_jobs(self, write=True):
+        """Yield the jobs dict from the job file, writing it back afterwards if write is set"""
+        with self.lock, open(self.jobs_file + ".lock", 'a') as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                with open(self.jobs_file, 'r', encoding='utf-8') as f:
+                    jobs = json.load(f)
+            except FileNotFoundError:
+                jobs = {}
+            except ValueError as e:
+                print(f"Warning: Ignoring unreadable job file {self.jobs_file}: {e}")
+                jobs = {}
+            
+            yield jobs
+            
+            if write:
+                # Write to a temporary file first so an interrupted write never loses the existing checkpoints
+                fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(self.jobs_file) or ".", suffix='.tmp')
+                try:
+                    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                        json.dump(jobs, f, ensure_ascii=False, indent=1)
+                    os.replace(temp_path, self.jobs_file)
+                except Exception:
+                    os.unlink(temp_path)
+                    raise
+    
+    def open_job(self, file_path, backend=None):
+        """Return the SegmentJob for a file transcribed with a backend, with the segments completed by earlier runs"""
+        job_key = file_content_hash(file_path)
+        settings = extraction_settings("Audio", backend)
+        with self._locked_jobs(write=False) as jobs:
+            job = jobs.get(job_key)
+        if not job or job.get("settings") != settings:
+            # Segments transcribed with other settings cannot be reused
+            job = {}
+        segments = {int(index): result for index, result in job.get("segments", {}).items()}
+        return SegmentJob(self, job_key, settings, file_path, segments, job.get("total_segments"))
+    
+    def update(self, job, **changes):
+        """Merge segment results or other fields into a job's entry"""
+        with self._locked_jobs() as jobs:
+            entry = jobs.get(job.key)
+            if not entry or entry.get("settings") != job.settings:
+                entry = jobs[job.key] = {"settings": job.settings, "segments": {}}
+            entry["file"] = job.file_path
+            entry["updated"] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            segments = changes.pop("segments", {})
+            entry["segments"].update({str(index): result for index, result in segments.items()})
+            entry.update(changes)
+    
+    def remove(self, job):
+        with self._locked_jobs() as jobs:
+            jobs.pop(job.key, None)
+
+class SegmentJob:
+    """The checkpointed segments of one long audio file"""
+    
+    def __init__(self, checkpoints, key, settings, file_path, completed, total_segments):
+        self.checkpoints = checkpoints
+        self.key = key
+        self.settings = settings
+        self.file_path = file_path
+        # Results of the segments transcribed so far, by segment index
+        self.completed = completed
+        # Number of segments in the file, known once it has been decoded to the end
+        self.total_segments = total_segments
+    
+    def record_segment(self, index, result):
+        """Save the result of a successfully transcribed segment"""
+        self.completed[index] = result
+        try:
+            self.checkpoints.update(self, segments={index: result})
+        except Exception as e:
+            print(f"Warning: Could not checkpoint segment {index + 1}: {e}")
+    
+    def record_total(self, total_segments):
+        self.total_segments = total_segments
+        try:
+            self.checkpoints.update(self, total_segments=total_segments)
+        except Exception as e:
+            print(f"Warning: Could not checkpoint segment count: {e}")
+    
+    def finish(self):
+        """Drop the checkpoints once every segment has been transcribed"""
+        try:
+            self.checkpoints.remove(self)
+        except Exception as e:
+            print(f"Warning: Could not remove finished job from {self.checkpoints.jobs_file}: {e}")
+
+segment_checkpoints = SegmentCheckpoints(BATCH_JOBS_FILE)
+
+def extract_text(file_path, file_type, use_cache=True):
+    """Extract text based on file type, reusing cached results for files with identical content"""
+    with profile_extraction(file_path), span("extract", file=file_path, type=file_type) as extract_span:
+        if os.path.isfile(file_path):
+            extract_span.bytes = os.path.getsize(file_path)
+        extraction_result = _extract_text(file_path, file_type, use_cache)
+        extract_span.fields["method"] = extraction_result["method"]
+        extract_span.fields["output_chars"] = len(extraction_result["text"])
+        return extraction_result
+
+def lookup_cached_result(file_path, file_type):
+    """Return (cache_keys, cached_result) for a file; either may be None"""
+    # Cleared here so that store_cached_result sees the backend chosen for this file, not an earlier one
+    transcription_backend_used.set(None)
+    try:
+        with span("cache.lookup") as lookup_span:
+            cache_keys = extraction_cache.keys_for(file_path, file_type)
+            cached_result = extraction_cache.get(*cache_keys.values()) if cache_keys else None
+            lookup_span.fields["hit"] = bool(cached_result)
+        if cached_result:
+            print(f"Using cached extraction result for {file_path}")
+        return cache_keys, cached_result
+    except Exception as e:
+        print(f"Warning: Extraction cache unavailable: {e}")
+        return None, None
+
+def store_cached_result(cache_keys, extraction_result):
+    """Cache an extraction result; failed extractions are not cached so they are retried next time
+    
+    Audio and video results go under the key of the transcription backend that produced them.
+    """
+    if not cache_keys or extraction_result["method"].startswith("Error"):
+        return
+    backend = transcription_backend_used.get()
+    # A video without an audio track was not transcribed at all, so any of its keys will do
+    cache_key = cache_keys.get(backend) if backend else next(iter(cache_keys.values()))
+    if not cache_key:
+        return
+    try:
+        with span("cache.store"):
+            extraction_cache.put(cache_key, extraction_result)
+    except Exception as e:
+        print(f"Warning: Could not write extraction cache entry: {e}")
+
+def _extract_text(file_path, file_type, use_cache):
+    """Look the file up in the extraction cache, otherwise run the extractor for its type"""
+    cache_keys = None
+    if use_cache:
+        cache_keys, cached_result = lookup_cached_result(file_path, file_type)
+        if cached_result:
+            return cached_result
+    
+    # Run the extractor for this type of file
     if file_type == "Text":
-        return extract_text_from_txt(file_path)
+        extraction_result = extract_text_from_txt(file_path)
     elif file_type == "PDF":
-        return extract_text_from_pdf(file_path)
+        extraction_result = extract_text_from_pdf(file_path)
     elif file_type == "Image":
-        return extract_text_from_image(file_path)
+        extraction_result = extract_text_from_image(file_path)
     elif file_type == "Audio":
-        return extract_text_from_audio(file_path)
+        extraction_result = extract_text_from_audio(file_path)
     elif file_type == "Video":
-        return extract_text_from_video(file_path)
+        extraction_result = extract_text_from_video(file_path)
+    elif file_type == "Archive":
+        extraction_result = extract_text_from_archive(file_path)
     else:
         return {"text": f"Cannot extract text from unknown file type: {file_path}", "method": "Unknown"}
+    
+    store_cached_result(cache_keys, extraction_result)
+    return extraction_result
 
-def save_extracted_text(file_path, extraction_result, file_type):
-    """Save the extracted text to a file in the extracts folder"""
+# Extractors that produce their text incrementally, page by page or segment by segment
+STREAMING_EXTRACTORS = {
+    "Text": stream_txt_text,
+    "PDF": stream_pdf_text,
+    "Audio": stream_audio_text,
+    "Video": stream_video_text,
+    "Archive": stream_archive_text,
+}
+
+def stream_extract_text(file_path, file_type, use_cache=True):
+    """Like extract_text(), but return an ExtractionStream that yields the text as it is extracted
+    
+    Cached results and file types without a streaming extractor come out as a single chunk.
+    """
+    if file_type not in STREAMING_EXTRACTORS:
+        return ExtractionStream(stream_result(extract_text(file_path, file_type, use_cache)))
+    return ExtractionStream(_stream_extract_text(file_path, file_type, use_cache))
+
+def _stream_extract_text(file_path, file_type, use_cache):
+    with profile_extraction(file_path), span("extract", file=file_path, type=file_type, stream=True) as extract_span:
+        if os.path.isfile(file_path):
+            extract_span.bytes = os.path.getsize(file_path)
+        
+        cache_keys, cached_result = lookup_cached_result(file_path, file_type) if use_cache else (None, None)
+        if cached_result:
+            extraction_result = cached_result
+            output_chars = len(cached_result["text"])
+            yield cached_result["text"]
+        else:
+            # Pass the chunks on as they come, keeping them only if they go to the cache
+            chunks = []
+            output_chars = 0
+            stream = ExtractionStream(STREAMING_EXTRACTORS[file_type](file_path))
+            for chunk in stream:
+                output_chars += len(chunk)
+                if cache_keys:
+                    chunks.append(chunk)
+                yield chunk
+            extraction_result = {"text": "".join(chunks), "method": stream.method}
+            store_cached_result(cache_keys, extraction_result)
+        
+        extract_span.fields["method"] = extraction_result["method"]
+        extract_span.fields["output_chars"] = output_chars
+        return extraction_result["method"]
+
+def open_new_extract_file(stem):
+    """Create a new file for extracted text in the extracts folder and return (path, file)
+    
+    Files are created exclusively, so batch workers saving files with the same name from different
+    folders in the same second get "_2", "_3", ... suffixes instead of overwriting each other.
+    """
+    counter = 1
+    while True:
+        save_path = os.path.join(EXTRACTS_DIR, f"{stem}.txt" if counter == 1 else f"{stem}_{counter}.txt")
+        try:
+            return save_path, open(save_path, 'x', encoding='utf-8')
+        except FileExistsError:
+            counter += 1
+
+def save_extracted_text(file_path, extraction_result, file_type, on_chunk=None):
+    """Save the extracted text to a file in the extracts folder
+    
+    extraction_result is a {"text", "method"} result or an ExtractionStream. A stream is written chunk by
+    chunk as it is extracted, so a partial result is on disk if the run stops halfway; each chunk is also
+    passed to on_chunk, and the extraction method goes at the end of the file once it is known.
+    """
     # Get original filename without extension
     original_filename = os.path.basename(file_path)
     filename_without_ext = os.path.splitext(original_filename)[0]
     
     # Create a new filename with timestamp
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    new_filename = f"{filename_without_ext}_{file_type}_{timestamp}.txt"
+    stem = f"{filename_without_ext}_{file_type}_{timestamp}"
     
-    # Full path to save
-    save_path = os.path.join(EXTRACTS_DIR, new_filename)
+    if isinstance(extraction_result, ExtractionStream):
+        return save_extracted_stream(file_path, extraction_result, file_type, stem, on_chunk)
     
     extracted_text = extraction_result["text"]
     extraction_method = extraction_result["method"]
     
     # Save the extracted text
     try:
-        with open(save_path, 'w', encoding='utf-8') as f:
+        save_path, f = open_new_extract_file(stem)
+        with span("save", file=file_path, bytes=len(extracted_text.encode('utf-8'))), f:
             f.write(f"Original file: {file_path}\n")
             f.write(f"File type: {file_type}\n")
             f.write(f"Extraction method: {extraction_method}\n")
@@ -589,11 +2976,42 @@ def save_extracted_text(file_path, extraction_result, file_type):
         print(f"Error saving extracted text: {e}")
         return None
 
-def handle_file(file_path, text_display):
-    """Handle the uploaded file and extract text"""
+def save_extracted_stream(file_path, stream, file_type, stem, on_chunk=None):
+    """Append the chunks of an ExtractionStream to a new extracts file as they arrive; see save_extracted_text()"""
+    try:
+        save_path, f = open_new_extract_file(stem)
+    except Exception as e:
+        # The text is still extracted and passed to on_chunk, it just is not saved
+        print(f"Error saving extracted text: {e}")
+        for chunk in stream:
+            if on_chunk:
+                on_chunk(chunk)
+        return None
+    
+    with f:
+        f.write(f"Original file: {file_path}\n")
+        f.write(f"File type: {file_type}\n")
+        f.write(f"Extraction time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        f.write("-" * 50 + "\n\n")
+        f.flush()
+        
+        for chunk in stream:
+            with span("save", file=file_path, bytes=len(chunk.encode('utf-8'))):
+                f.write(chunk)
+                f.flush()
+            if on_chunk:
+                on_chunk(chunk)
+        
+        f.write("\n\n" + "-" * 50 + "\n")
+        f.write(f"Extraction method: {stream.method}\n")
+    return save_path
+
+def describe_file(file_path):
+    """Detect the type and size of an uploaded file and log it to the console"""
     file_name = os.path.basename(file_path)
     file_size = os.path.getsize(file_path)
-    file_type = detect_file_type(file_path)
+    with span("detect", file=file_path):
+        file_type = detect_file_type(file_path)
     
     print(f"\nFile uploaded successfully!")
     print(f"File name: {file_name}")
@@ -601,94 +3019,296 @@ def handle_file(file_path, text_display):
     print(f"File size: {file_size} bytes")
     print(f"Upload time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     
-    # Clear the text display
-    text_display.delete(1.0, tk.END)
-    
-    # Add file info to display
-    text_display.insert(tk.END, f"File: {file_name}\n")
-    text_display.insert(tk.END, f"Type: {file_type}\n")
-    text_display.insert(tk.END, f"Size: {file_size} bytes\n")
-    text_display.insert(tk.END, f"Uploaded: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-    
-    # Extract and display text
-    text_display.insert(tk.END, "Extracted Text:\n--------------\n")
-    
+    return {"path": file_path, "name": file_name, "size": file_size, "type": file_type}
+
+def extract_and_save(file_path, file_type):
+    """Extract text from a file, save it to the extracts folder and return (extraction_result, saved_file_path)"""
     # Extract text based on file type
     extraction_result = extract_text(file_path, file_type)
     extracted_text = extraction_result["text"]
     extraction_method = extraction_result["method"]
     
-    # Show extraction method
-    text_display.insert(tk.END, f"Extraction method: {extraction_method}\n\n")
-    
     # Show a preview in the console
     preview = extracted_text[:100] + "..." if len(extracted_text) > 100 else extracted_text
     print(f"Text preview: {preview}")
     print(f"Extraction method: {extraction_method}")
     
-    # Display the extracted text
-    text_display.insert(tk.END, extracted_text)
-    
     # Save the extracted text
     saved_file_path = save_extracted_text(file_path, extraction_result, file_type)
     
     if saved_file_path:
         print(f"Extracted text saved to: {saved_file_path}")
-        text_display.insert(tk.END, f"\n\nExtracted text saved to: {saved_file_path}")
     else:
         print("Failed to save extracted text")
+    return extraction_result, saved_file_path
+
+def stream_and_save(file_path, file_type, on_chunk):
+    """Extract text from a file as a stream, saving each chunk and passing it to on_chunk as it arrives
+    
+    Returns (extraction_method, saved_file_path).
+    """
+    stream = stream_extract_text(file_path, file_type)
+    saved_file_path = save_extracted_text(file_path, stream, file_type, on_chunk=on_chunk)
+    print(f"Extraction method: {stream.method}")
+    
+    if saved_file_path:
+        print(f"Extracted text saved to: {saved_file_path}")
+    else:
+        print("Failed to save extracted text")
+    return stream.method, saved_file_path
+
+def show_file_info(text_display, file_info):
+    """Replace the contents of the text display with the details of a file"""
+    import tkinter as tk
+    
+    # Clear the text display
+    text_display.delete(1.0, tk.END)
+    
+    # Add file info to display
+    text_display.insert(tk.END, f"File: {file_info['name']}\n")
+    text_display.insert(tk.END, f"Type: {file_info['type']}\n")
+    text_display.insert(tk.END, f"Size: {file_info['size']} bytes\n")
+    text_display.insert(tk.END, f"Uploaded: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+    
+    # Extract and display text
+    text_display.insert(tk.END, "Extracted Text:\n--------------\n")
+
+def show_extraction_result(text_display, extraction_result, saved_file_path):
+    """Append an extraction result to the text display"""
+    import tkinter as tk
+    
+    # Show extraction method
+    text_display.insert(tk.END, f"Extraction method: {extraction_result['method']}\n\n")
+    
+    # Display the extracted text
+    text_display.insert(tk.END, extraction_result["text"])
+    
+    if saved_file_path:
+        text_display.insert(tk.END, f"\n\nExtracted text saved to: {saved_file_path}")
+    else:
         text_display.insert(tk.END, "\n\nFailed to save extracted text")
 
-def upload_file(text_display):
-    """Open file dialog to select a file and process it"""
-    file_path = filedialog.askopenfilename(
-        title="Select File",
+def show_extraction_footer(text_display, extraction_method, saved_file_path):
+    """Append the method and save location of a streamed extraction, whose text is already displayed"""
+    import tkinter as tk
+    
+    text_display.insert(tk.END, f"\n\nExtraction method: {extraction_method}")
+    
+    if saved_file_path:
+        text_display.insert(tk.END, f"\nExtracted text saved to: {saved_file_path}")
+    else:
+        text_display.insert(tk.END, "\nFailed to save extracted text")
+
+def handle_file(file_path, text_display):
+    """Handle the uploaded file and extract text"""
+    file_info = describe_file(file_path)
+    show_file_info(text_display, file_info)
+    extraction_result, saved_file_path = extract_and_save(file_path, file_info["type"])
+    show_extraction_result(text_display, extraction_result, saved_file_path)
+
+class BackgroundExtractor:
+    """Runs queued GUI extractions one at a time on a background thread
+    
+    Tk widgets may only be touched from the main thread, so the worker posts updates to a queue
+    that the main loop drains with root.after.
+    """
+    
+    POLL_INTERVAL_MS = 100
+    
+    def __init__(self, root, text_display, status, progress_bar, cancel_btn):
+        self.root = root
+        self.text_display = text_display
+        self.status = status
+        self.progress_bar = progress_bar
+        self.cancel_btn = cancel_btn
+        
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="extractor")
+        self.updates = queue.Queue()
+        self.lock = threading.Lock()
+        self.queued_files = 0
+        self.current_job = None
+        self.current_file = None
+        
+        self.root.after(self.POLL_INTERVAL_MS, self._poll_updates)
+    
+    def enqueue(self, file_path):
+        """Add a file to the extraction queue"""
+        with self.lock:
+            self.queued_files += 1
+        self.executor.submit(self._run, file_path)
+        self._show_status()
+    
+    def cancel_current(self):
+        """Stop the file being extracted; queued files still run"""
+        with self.lock:
+            job = self.current_job
+        if job is not None:
+            job.cancel()
+            self.status.config(text=f"Cancelling {self.current_file}...")
+    
+    def shutdown(self):
+        """Cancel everything and close the window"""
+        self.cancel_current()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.root.destroy()
+    
+    def _post(self, callback, *args):
+        # Called from the worker thread
+        self.updates.put((callback, args))
+    
+    def _poll_updates(self):
+        try:
+            while True:
+                callback, args = self.updates.get_nowait()
+                callback(*args)
+        except queue.Empty:
+            pass
+        self.root.after(self.POLL_INTERVAL_MS, self._poll_updates)
+    
+    def _run(self, file_path):
+        """Extract one file on the worker thread"""
+        file_name = os.path.basename(file_path)
+        job = ExtractionJob(on_progress=lambda done, total, unit: self._post(self._show_progress, done, total, unit))
+        with self.lock:
+            self.queued_files -= 1
+            self.current_job = job
+            self.current_file = file_name
+        
+        try:
+            with run_as_job(job):
+                file_info = describe_file(file_path)
+                self._post(self._start_file, file_info)
+                # Show the text page by page or segment by segment as it is extracted
+                extraction_method, saved_file_path = stream_and_save(
+                    file_path, file_info["type"], on_chunk=lambda chunk: self._post(self._insert_text, chunk))
+            self._post(show_extraction_footer, self.text_display, extraction_method, saved_file_path)
+        except ExtractionCancelled:
+            print(f"Extraction of {file_name} was cancelled")
+            self._post(self._insert_text, f"\n\nExtraction of {file_name} was cancelled.")
+        except Exception as e:
+            print(f"Error processing {file_name}: {e}")
+            traceback.print_exc()
+            self._post(self._insert_text, f"\n\nError processing {file_name}: {e}")
+        finally:
+            with self.lock:
+                self.current_job = None
+                self.current_file = None
+            self._post(self._finish_file)
+    
+    def _insert_text(self, text):
+        import tkinter as tk
+        self.text_display.insert(tk.END, text)
+    
+    def _start_file(self, file_info):
+        show_file_info(self.text_display, file_info)
+        # Until the extractor reports page or segment counts we can only show that it is busy
+        self.progress_bar.config(mode='indeterminate', value=0)
+        self.progress_bar.start()
+        self.cancel_btn.config(state='normal')
+        self._show_status()
+    
+    def _show_progress(self, done, total, unit):
+        self.progress_bar.stop()
+        self.progress_bar.config(mode='determinate', maximum=max(total, 1), value=done)
+        self._show_status(f" ({done}/{total} {unit})")
+    
+    def _finish_file(self):
+        self.progress_bar.stop()
+        self.progress_bar.config(mode='determinate', value=0)
+        self.cancel_btn.config(state='disabled')
+        self._show_status()
+    
+    def _show_status(self, detail=""):
+        with self.lock:
+            current_file = self.current_file
+            queued_files = self.queued_files
+        if current_file:
+            text = f"Processing {current_file}{detail}"
+        else:
+            text = "Ready"
+        if queued_files:
+            text += f" - {queued_files} file(s) queued"
+        self.status.config(text=text)
+
+def upload_file(extractor):
+    """Open file dialog to select one or more files and queue them for extraction"""
+    from tkinter import filedialog
+    
+    file_paths = filedialog.askopenfilenames(
+        title="Select Files",
         filetypes=[
-            ("All Supported Files", "*.txt *.pdf *.jpg *.jpeg *.png *.gif *.mp3 *.wav *.ogg *.flac *.aac *.m4a *.mp4 *.avi *.mov *.mkv *.webm *.flv"),
+            ("All Supported Files", "*.txt *.pdf *.jpg *.jpeg *.png *.gif *.mp3 *.wav *.ogg *.flac *.aac *.m4a *.mp4 *.avi *.mov *.mkv *.webm *.flv *.zip *.tar *.tar.gz *.tgz"),
             ("Text Files", "*.txt *.csv *.md *.json *.xml *.html"),
             ("PDF Files", "*.pdf"),
             ("Image Files", "*.jpg *.jpeg *.png *.gif *.bmp *.webp *.tiff"),
             ("Audio Files", "*.mp3 *.wav *.ogg *.flac *.aac *.m4a"),
             ("Video Files", "*.mp4 *.avi *.mov *.mkv *.webm *.flv"),
+            ("Archives", "*.zip *.tar *.tar.gz *.tgz *.tar.bz2 *.tar.xz"),
             ("All Files", "*.*")
         ]
     )
     
-    if file_path:
-        handle_file(file_path, text_display)
+    if file_paths:
+        for file_path in file_paths:
+            extractor.enqueue(file_path)
     else:
         print("No file selected.")
 
 def create_gui():
     """Create the GUI for file upload"""
+    import tkinter as tk
+    from tkinter import scrolledtext, ttk
+    
     root = tk.Tk()
     root.title("Multilingual Text Extractor")
-    root.geometry("600x500")
+    root.geometry("600x560")
     
     # Header
     header = tk.Label(root, text="Multilingual Text Extractor", font=("Arial", 18))
     header.pack(pady=20)
     
     # Description
-    desc = tk.Label(root, text="Upload a file to extract text (supports various formats including Indic languages)")
+    desc = tk.Label(root, text="Upload files to extract text (supports various formats including Indic languages)")
     desc.pack(pady=5)
     
     # Folder info
     folder_info = tk.Label(root, text=f"Extracted files will be saved in: {os.path.abspath(EXTRACTS_DIR)}")
     folder_info.pack(pady=5)
     
-    # Upload button
+    # Upload and cancel buttons
+    buttons = tk.Frame(root)
+    buttons.pack(pady=10)
+    
     upload_btn = tk.Button(
-        root, 
-        text="Upload File",
-        command=lambda: upload_file(text_display),
+        buttons, 
+        text="Upload Files",
+        command=lambda: upload_file(extractor),
         width=20,
         height=2,
         bg="#4CAF50",
         fg="white",
         font=("Arial", 12, "bold")
     )
-    upload_btn.pack(pady=10)
+    upload_btn.pack(side=tk.LEFT, padx=5)
+    
+    cancel_btn = tk.Button(
+        buttons,
+        text="Cancel",
+        command=lambda: extractor.cancel_current(),
+        width=10,
+        height=2,
+        state='disabled',
+        font=("Arial", 12)
+    )
+    cancel_btn.pack(side=tk.LEFT, padx=5)
+    
+    # Status bar
+    status = tk.Label(root, text="Ready", bd=1, relief=tk.SUNKEN, anchor=tk.W)
+    status.pack(side=tk.BOTTOM, fill=tk.X)
+    
+    # Progress of the current file, driven by page and segment counts
+    progress_bar = ttk.Progressbar(root, orient=tk.HORIZONTAL, mode='determinate')
+    progress_bar.pack(side=tk.BOTTOM, fill=tk.X, padx=20, pady=5)
     
     # Text display area
     frame = tk.Frame(root)
@@ -703,13 +3323,15 @@ def create_gui():
     )
     text_display.pack(fill=tk.BOTH, expand=True)
     
-    # Status bar
-    status = tk.Label(root, text="Ready", bd=1, relief=tk.SUNKEN, anchor=tk.W)
-    status.pack(side=tk.BOTTOM, fill=tk.X)
+    extractor = BackgroundExtractor(root, text_display, status, progress_bar, cancel_btn)
+    root.protocol("WM_DELETE_WINDOW", extractor.shutdown)
     
     root.mainloop()
 
-def main():
+def check_backends():
+    """Print the availability of the OCR, Tika and speech-to-text backends"""
+    import pytesseract
+    
     # Check for Tesseract installation
     try:
         pytesseract.get_tesseract_version()
@@ -719,9 +3341,12 @@ def main():
         print("Please install Tesseract OCR: https://github.com/tesseract-ocr/tesseract")
     except Exception as e:
         print(f"Warning: Issue with Tesseract OCR: {e}")
+    if use_tesserocr():
+        print("OCR runs in-process with tesserocr.")
     
     # Check for Tika
     try:
+        import tika
         tika_ver = tika.version.TIKA_VERSION
         print(f"Apache Tika is available (version connector: {tika_ver})")
     except:
@@ -739,17 +3364,915 @@ def main():
         print(f"API Key (first 4 chars): {api_key_preview}")
         print(f"Real-time API URL: {SARVAM_SPEECH_TO_TEXT_TRANSLATE_URL}")
         print(f"Batch API URL: {SARVAM_BATCH_NOTEBOOK_URL}")
-        print("Using Sarvam AI's speech-to-text-translate API with model 'saaras:v2'")
+        print(f"Using Sarvam AI's speech-to-text-translate API with model '{SARVAM_MODEL}'")
         print("Available models: saaras:v1, saaras:v2, saaras:turbo, saaras:flash")
     
+    # Check for the local speech recognition backend
+    if local_asr_available():
+        print(f"\nLocal speech recognition is available (faster-whisper, model '{LOCAL_ASR_MODEL}', {LOCAL_ASR_COMPUTE_TYPE}).")
+    elif TRANSCRIPTION_BACKEND == 'local':
+        print("\nWarning: TRANSCRIPTION_BACKEND is 'local' but faster-whisper is not installed (pip install faster-whisper).")
+    print(f"Transcription backend: {TRANSCRIPTION_BACKEND}")
+
+def collect_input_files(sources, manifest=None):
+    """Expand directories, glob patterns and manifest files into a list of file paths"""
+    file_paths = []
+    
+    for source in sources:
+        if os.path.isdir(source):
+            # Walk the directory recursively, in a stable order
+            for dir_path, dir_names, file_names in os.walk(source):
+                dir_names.sort()
+                for file_name in sorted(file_names):
+                    file_paths.append(os.path.join(dir_path, file_name))
+        elif os.path.isfile(source):
+            file_paths.append(source)
+        else:
+            # Anything else is treated as a glob pattern
+            matches = sorted(glob.glob(source, recursive=True))
+            if not matches:
+                print(f"Warning: No files matched: {source}")
+            file_paths.extend(path for path in matches if os.path.isfile(path))
+    
+    if manifest:
+        # A manifest is either a JSON list of paths or a plain text file with one path per line
+        with open(manifest, 'r', encoding='utf-8') as f:
+            content = f.read()
+        try:
+            entries = json.loads(content)
+        except ValueError:
+            entries = [line.strip() for line in content.splitlines()]
+        base_dir = os.path.dirname(os.path.abspath(manifest))
+        for entry in entries:
+            if not entry or entry.startswith('#'):
+                continue
+            # Relative paths in a manifest are resolved against the manifest's folder
+            path = entry if os.path.isabs(entry) else os.path.join(base_dir, entry)
+            if os.path.isfile(path):
+                file_paths.append(path)
+            else:
+                print(f"Warning: Manifest entry not found: {entry}")
+    
+    # Drop duplicates while keeping the original order
+    seen = set()
+    unique_paths = []
+    for path in file_paths:
+        key = os.path.abspath(path)
+        if key not in seen:
+            seen.add(key)
+            unique_paths.append(path)
+    return unique_paths
+
+def _init_batch_worker(trace_file, profiler, transcribing_processes=1):
+    """Set up a batch worker process
+    
+    Batch workers already run one file per core, so each one extracts PDF pages in-process.
+    Each of the `transcribing_processes` workers that can call the Sarvam AI API at the same time gets
+    an equal share of its rate limit, so the pool as a whole stays within SARVAM_REQUESTS_PER_SECOND.
+    Trace and profiler settings from the command line are passed on explicitly.
+    """
+    global PDF_PAGE_WORKERS, EXTRACTION_TRACE_FILE, EXTRACTION_PROFILER, sarvam_rate_limiter
+    PDF_PAGE_WORKERS = 1
+    EXTRACTION_TRACE_FILE = trace_file
+    EXTRACTION_PROFILER = profiler
+    transcribing_processes = max(1, transcribing_processes)
+    sarvam_rate_limiter = TokenBucket(SARVAM_REQUESTS_PER_SECOND / transcribing_processes,
+                                      SARVAM_REQUEST_BURST // transcribing_processes)
+
+def _init_watch_worker(trace_file, profiler, transcribing_processes=1):
+    """Set up a watch mode worker process; Ctrl+C stops the watcher, which lets the workers finish their files"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _init_batch_worker(trace_file, profiler, transcribing_processes)
+
+class ScheduledJob:
+    """A file waiting in, or running from, one of the scheduler's queues"""
+    
+    def __init__(self, file_path, file_type, cost, memory_mb, sequence):
+        self.file_path = file_path
+        self.file_type = file_type
+        self.cost = cost
+        self.memory_mb = memory_mb
+        self.sequence = sequence
+        self.queued_at = time.monotonic()
+    
+    def priority(self, now):
+        """Lower runs first: the estimated cost, reduced by the time spent waiting so long jobs are not starved"""
+        if SCHEDULER_POLICY == 'fifo':
+            return self.sequence
+        return self.cost - (now - self.queued_at) * SCHEDULER_AGING
+
+def estimate_extraction_job(file_path, file_type):
+    """Estimate the seconds and memory (MB) extracting a file will take, from its size and media duration
+    
+    The figures are rough per-type rates; they only have to order the jobs and keep memory in bounds.
+    """
+    try:
+        size_mb = os.path.getsize(file_path) / (1024 * 1024)
+    except OSError:
+        return 0.0, 10
+    
+    if file_type == "Text":
+        return 0.05 + size_mb * 0.02, 50 + min(size_mb, TEXT_MAX_BYTES / (1024 * 1024)) * 3
+    if file_type == "PDF":
+        # Scanned pages dominate: roughly one page, OCR'd in half a second, per 100 KB
+        return 0.2 + size_mb * 5, 150 + size_mb * 2
+    if file_type == "Image":
+        megapixels = size_mb * 5
+        try:
+            from PIL import Image
+            # Only the header is read
+            with Image.open(file_path) as img:
+                megapixels = img.width * img.height / 1e6
+        except Exception:
+            pass
+        return 0.5 + megapixels * 0.3, 50 + megapixels * 10
+    if file_type in ("Audio", "Video"):
+        duration = None
+        try:
+            # WAV files give their exact duration; everything else is estimated from a typical bitrate
+            with wave.open(file_path, 'rb') as wav_file:
+                duration = wav_file.getnframes() / float(wav_file.getframerate())
+        except Exception:
+            pass
+        if file_type == "Audio":
+            if duration is None:
+                duration = size_mb * 8 * 1024 / 128
+            return 1.0 + duration * 0.1, 150
+        if duration is None:
+            duration = size_mb * 8 * 1024 / 2000
+        # The audio track, plus two decoded 16:9 frames per OCR worker waiting for slide OCR
+        frame_mb = VIDEO_FRAME_MAX_WIDTH * VIDEO_FRAME_MAX_WIDTH * 9 / 16 / (1024 * 1024)
+        return 2.0 + duration * 0.2, 300 + frame_mb * OCR_TILE_WORKERS * 2
+    if file_type == "Archive":
+        return 1.0 + size_mb * 0.5, 200 + ARCHIVE_MEMBER_WORKERS * 150
+    return 0.01, 10
+
+class ExtractionScheduler:
+    """Orders bulk extraction jobs through one queue per file type, within concurrency and memory budgets
+    
+    Whenever a worker is free, the waiting job with the lowest priority() among the queues that are under
+    their worker and memory limits is started, so cheap files (a text file, a small image) do not wait
+    behind a two-hour video. A job larger than a budget still runs when nothing else counts against it.
+    """
+    
+    def __init__(self, workers, queues=None, memory_mb=None):
+        self.workers = workers
+        self.memory_mb = memory_mb if memory_mb is not None else SCHEDULER_MEMORY_MB
+        queues = queues or SCHEDULER_QUEUES
+        self.limits = {file_type: {"workers": min(workers, limits.get("workers", workers)), "memory_mb": limits.get("memory_mb", self.memory_mb)}
+                       for file_type, limits in queues.items()}
+        self.waiting = collections.defaultdict(list)
+        self.running = collections.Counter()
+        self.running_memory = collections.Counter()
+        self.running_count = 0
+        self.sequence = 0
+    
+    def add(self, file_path):
+        """Detect the type of a file, estimate its cost and queue it"""
+        with span("detect", file=file_path):
+            file_type = detect_file_type(file_path)
+        cost, memory_mb = estimate_extraction_job(file_path, file_type)
+        self.sequence += 1
+        self.waiting[file_type].append(ScheduledJob(file_path, file_type, cost, memory_mb, self.sequence))
+    
+    def _limits(self, file_type):
+        return self.limits.get(file_type, {"workers": self.workers, "memory_mb": self.memory_mb})
+    
+    def transcribing_workers(self):
+        """How many workers can be calling the speech-to-text API at once: the Audio, Video and Archive
+        (which may hold recordings) limits together, at most the whole pool"""
+        return max(1, min(self.workers, sum(self._limits(file_type)["workers"] for file_type in ("Audio", "Video", "Archive"))))
+    
+    def _fits(self, job):
+        limits = self._limits(job.file_type)
+        if self.running[job.file_type] >= limits["workers"]:
+            return False
+        if self.running[job.file_type] and self.running_memory[job.file_type] + job.memory_mb > limits["memory_mb"]:
+            return False
+        total_memory = sum(self.running_memory.values())
+        return not self.running_count or total_memory + job.memory_mb <= self.memory_mb
+    
+    def next_job(self):
+        """Remove and return the job to start next, or None if no queue may start one now"""
+        if self.running_count >= self.workers:
+            return None
+        now = time.monotonic()
+        best = None
+        for jobs in self.waiting.values():
+            if not jobs:
+                continue
+            # Queues are short enough that a scan is cheaper than keeping heaps whose priorities age
+            head = min(jobs, key=lambda job: job.priority(now))
+            if self._fits(head) and (best is None or head.priority(now) < best.priority(now)):
+                best = head
+        if best is not None:
+            self.waiting[best.file_type].remove(best)
+            self.running[best.file_type] += 1
+            self.running_memory[best.file_type] += best.memory_mb
+            self.running_count += 1
+        return best
+    
+    def finish(self, job):
+        self.running[job.file_type] -= 1
+        self.running_memory[job.file_type] -= job.memory_mb
+        self.running_count -= 1
+    
+    def pending(self):
+        return sum(len(jobs) for jobs in self.waiting.values())
+    
+    def run(self, submit):
+        """Start jobs with submit(job), which returns a Future, and yield (job, result) as they finish"""
+        running = {}
+        while self.pending() or running:
+            job = self.next_job()
+            while job is not None:
+                running[submit(job)] = job
+                job = self.next_job()
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                job = running.pop(future)
+                self.finish(job)
+                yield job, future.result()
+    
+    def describe(self):
+        """One line per queue with its waiting jobs, limits and estimated work"""
+        lines = []
+        for file_type, jobs in sorted(self.waiting.items()):
+            if jobs:
+                limits = self._limits(file_type)
+                lines.append(f"  {file_type}: {len(jobs)} files, {sum(job.cost for job in jobs):.1f}s estimated, "
+                             f"up to {limits['workers']} at once within {limits['memory_mb']:.0f} MB")
+        return "\n".join(lines)
+
+def _batch_worker(file_path, save=True, use_cache=True, file_type=None):
+    """Extract and save a single file inside a worker process"""
+    start = time.time()
+    try:
+        if not file_type:
+            with span("detect", file=file_path):
+                file_type = detect_file_type(file_path)
+        cache_hits = extraction_cache.hits
+        extraction_result = extract_text(file_path, file_type, use_cache=use_cache)
+        saved_file_path = save_extracted_text(file_path, extraction_result, file_type) if save else None
+        return {
+            "file": file_path,
+            "type": file_type,
+            "method": extraction_result["method"],
+            "saved_to": saved_file_path,
+            "elapsed": time.time() - start,
+            "cached": extraction_cache.hits > cache_hits,
+            "ok": not extraction_result["method"].startswith("Error") and file_type != "Unknown"
+        }
+    except Exception as e:
+        return {
+            "file": file_path,
+            "type": "Unknown",
+            "method": f"Error: {str(e)}",
+            "saved_to": None,
+            "elapsed": time.time() - start,
+            "cached": False,
+            "ok": False
+        }
+
+def run_batch(file_paths, workers=None, save=True, use_cache=True):
+    """Extract text from many files in parallel using a pool of worker processes"""
+    workers = workers or os.cpu_count() or 1
+    total = len(file_paths)
+    if not total:
+        print("No input files found.")
+        return []
+    
+    print(f"Extracting text from {total} files using {workers} worker processes...")
+    batch_start = time.time()
+    results = []
+    
+    scheduler = ExtractionScheduler(workers)
+    for path in file_paths:
+        scheduler.add(path)
+    print(scheduler.describe())
+    # Time from the start of the batch until each file was done, per type
+    turnaround = collections.defaultdict(list)
+    
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker,
+                             initargs=(EXTRACTION_TRACE_FILE, EXTRACTION_PROFILER, scheduler.transcribing_workers())) as executor:
+        submit = lambda job: executor.submit(_batch_worker, job.file_path, save, use_cache, job.file_type)
+        for done, (job, result) in enumerate(scheduler.run(submit), start=1):
+            results.append(result)
+            turnaround[job.file_type].append(time.time() - batch_start)
+            status = ("CACHED" if result["cached"] else "OK") if result["ok"] else "FAILED"
+            line = f"[{done}/{total}] {status} {result['file']} ({result['type']}, {result['method']}, {result['elapsed']:.2f}s)"
+            if result["saved_to"]:
+                line += f" -> {result['saved_to']}"
+            print(line, flush=True)
+    
+    failed = sum(1 for result in results if not result["ok"])
+    print(f"\nProcessed {total} files in {time.time() - batch_start:.2f} seconds ({total - failed} succeeded, {failed} failed)")
+    if use_cache and extraction_cache.max_bytes > 0:
+        # Only some file types go through the cache; the others are neither hits nor misses
+        looked_up = [result for result in results if result["type"] in ExtractionCache.CACHED_TYPES]
+        cached = sum(1 for result in looked_up if result["cached"])
+        print(f"Extraction cache: {cached} hits, {len(looked_up) - cached} misses")
+    for file_type, times in sorted(turnaround.items()):
+        times.sort()
+        print(f"{file_type}: {len(times)} files done after p50 {times[len(times) // 2]:.2f}s, "
+              f"p95 {times[int(0.95 * (len(times) - 1))]:.2f}s, max {times[-1]:.2f}s")
+    return results
+
+def run_streaming(file_paths, save=True, use_cache=True):
+    """Extract files one at a time in this process, printing each file's text to stdout as it is extracted"""
+    results = []
+    for done, file_path in enumerate(file_paths, start=1):
+        start = time.time()
+        print(f"\n===== [{done}/{len(file_paths)}] {file_path} =====", flush=True)
+        
+        def print_chunk(chunk):
+            sys.stdout.write(chunk)
+            sys.stdout.flush()
+        
+        try:
+            with span("detect", file=file_path):
+                file_type = detect_file_type(file_path)
+            stream = stream_extract_text(file_path, file_type, use_cache=use_cache)
+            if save:
+                saved_file_path = save_extracted_text(file_path, stream, file_type, on_chunk=print_chunk)
+            else:
+                saved_file_path = None
+                for chunk in stream:
+                    print_chunk(chunk)
+            method = stream.method
+        except Exception as e:
+            file_type, method, saved_file_path = "Unknown", f"Error: {str(e)}", None
+        
+        ok = not method.startswith("Error") and file_type != "Unknown"
+        line = f"\n===== {'OK' if ok else 'FAILED'} ({file_type}, {method}, {time.time() - start:.2f}s)"
+        if saved_file_path:
+            line += f" -> {saved_file_path}"
+        print(line, flush=True)
+        results.append({"file": file_path, "type": file_type, "method": method, "saved_to": saved_file_path, "ok": ok})
+    return results
+
+class InotifyNotifier:
+    """Reports files written or moved into a set of directories, using Linux inotify through ctypes"""
+    
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_Q_OVERFLOW = 0x00004000
+    EVENT_HEADER = struct.Struct('iIII')
+    
+    def __init__(self, directories):
+        import ctypes
+        import ctypes.util
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        
+        self.directories = {}
+        for directory in directories:
+            watch = libc.inotify_add_watch(self.fd, os.fsencode(directory), self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_CREATE)
+            if watch < 0:
+                errno = ctypes.get_errno()
+                os.close(self.fd)
+                raise OSError(errno, f"Cannot watch {directory}")
+            self.directories[watch] = directory
+    
+    def wait(self, timeout):
+        """Return the paths changed within timeout seconds, or None if events were lost and everything must be rescanned"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        
+        data = os.read(self.fd, 64 * 1024)
+        paths = []
+        offset = 0
+        while offset < len(data):
+            watch, mask, _, name_length = self.EVENT_HEADER.unpack_from(data, offset)
+            offset += self.EVENT_HEADER.size
+            name = data[offset:offset + name_length].rstrip(b'\0')
+            offset += name_length
+            if mask & self.IN_Q_OVERFLOW:
+                return None
+            if name and watch in self.directories:
+                paths.append(os.path.join(self.directories[watch], os.fsdecode(name)))
+        return paths
+    
+    def close(self):
+        os.close(self.fd)
+
+class PollingNotifier:
+    """Stand-in for InotifyNotifier where inotify is unavailable: every wait asks for a full rescan"""
+    
+    def wait(self, timeout):
+        time.sleep(timeout)
+        return None
+    
+    def close(self):
+        pass
+
+class DirectoryWatcher:
+    """Extracts and saves files as they appear in a set of directories, on a bounded pool of worker processes
+    
+    Files are only picked up once they have stopped changing for settle_seconds, so partially written
+    uploads are not read. Every processed file is appended to state_file, keyed by path, size and
+    modification time, so a restarted watcher skips files it already handled. Failed files are skipped
+    for the rest of the run unless they change, and retried after a restart.
+    """
+    
+    def __init__(self, directories, workers=None, save=True, use_cache=True, settle_seconds=WATCH_SETTLE_SECONDS,
+                 poll_interval=WATCH_POLL_INTERVAL, state_file=WATCH_STATE_FILE, use_inotify=True):
+        self.directories = [os.path.abspath(directory) for directory in directories]
+        self.workers = workers or os.cpu_count() or 1
+        self.save = save
+        self.use_cache = use_cache
+        self.settle_seconds = settle_seconds
+        self.poll_interval = poll_interval
+        self.state_file = state_file
+        self.use_inotify = use_inotify
+        
+        # Keep at most two files per worker queued, the rest wait in self.pending
+        self.max_in_flight = self.workers * 2
+        self.lock = threading.Lock()
+        self.processed = self._load_processed()
+        # Keys of files that failed in this run; not kept in the state file, so a restart retries them
+        self.failed_keys = set()
+        # path -> (size, mtime_ns, time it was first seen at that size and mtime)
+        self.pending = {}
+        self.in_flight = set()
+        self.completed = 0
+        self.failed = 0
+    
+    @staticmethod
+    def file_key(path, size, mtime_ns):
+        return f"{path}|{size}|{mtime_ns}"
+    
+    def _load_processed(self):
+        processed = set()
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if record.get("ok"):
+                        processed.add(record["key"])
+        except FileNotFoundError:
+            pass
+        return processed
+    
+    def _record(self, key, result):
+        record = dict(result, key=key, processed_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+        with self.lock, open(self.state_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    
+    def observe(self, path):
+        """Note a new or changed file in a watched directory"""
+        name = os.path.basename(path)
+        if name.startswith('.') or name.lower().endswith(WATCH_IGNORED_SUFFIXES):
+            return
+        try:
+            stat = os.stat(path)
+        except OSError:
+            # Deleted or renamed before we got to it
+            self.pending.pop(path, None)
+            return
+        if not os.path.isfile(path):
+            return
+        
+        key = self.file_key(path, stat.st_size, stat.st_mtime_ns)
+        with self.lock:
+            if key in self.processed or key in self.failed_keys or key in self.in_flight:
+                return
+        previous = self.pending.get(path)
+        if not previous or previous[:2] != (stat.st_size, stat.st_mtime_ns):
+            self.pending[path] = (stat.st_size, stat.st_mtime_ns, time.monotonic())
+    
+    def scan(self):
+        for directory in self.directories:
+            try:
+                entries = list(os.scandir(directory))
+            except OSError as e:
+                print(f"Warning: Cannot scan {directory}: {e}")
+                continue
+            for entry in entries:
+                self.observe(entry.path)
+    
+    def submit_settled(self, executor):
+        """Send files that have stopped changing to the worker pool, as long as there is room"""
+        now = time.monotonic()
+        for path in list(self.pending):
+            # Check again so files still being written keep waiting
+            self.observe(path)
+            if path not in self.pending:
+                continue
+            size, mtime_ns, since = self.pending[path]
+            if now - since < self.settle_seconds:
+                continue
+            with self.lock:
+                if len(self.in_flight) >= self.max_in_flight:
+                    return
+                key = self.file_key(path, size, mtime_ns)
+                self.in_flight.add(key)
+            del self.pending[path]
+            future = executor.submit(_batch_worker, path, self.save, self.use_cache)
+            future.add_done_callback(functools.partial(self._file_done, key, path))
+    
+    def _file_done(self, key, path, future):
+        try:
+            result = future.result()
+        except Exception as e:
+            # The worker process died; the file is picked up again after a restart
+            result = {"file": path, "type": "Unknown", "method": f"Error: {e}", "saved_to": None, "elapsed": 0, "cached": False, "ok": False}
+        with self.lock:
+            self.in_flight.discard(key)
+            if result["ok"]:
+                self.processed.add(key)
+                self.completed += 1
+            else:
+                self.failed_keys.add(key)
+                self.failed += 1
+        try:
+            self._record(key, result)
+        except OSError as e:
+            print(f"Warning: Could not record {path} in {self.state_file}: {e}")
+        
+        status = ("CACHED" if result["cached"] else "OK") if result["ok"] else "FAILED"
+        line = f"{status} {path} ({result['type']}, {result['method']}, {result['elapsed']:.2f}s)"
+        if result["saved_to"]:
+            line += f" -> {result['saved_to']}"
+        print(line, flush=True)
+    
+    def _open_notifier(self):
+        if self.use_inotify:
+            try:
+                return InotifyNotifier(self.directories)
+            except (OSError, AttributeError) as e:
+                print(f"inotify unavailable ({e}), polling every {self.poll_interval}s instead")
+        return PollingNotifier()
+    
+    def run(self):
+        """Watch until interrupted with Ctrl+C, then finish the files in progress"""
+        for directory in self.directories:
+            os.makedirs(directory, exist_ok=True)
+        notifier = self._open_notifier()
+        mode = "inotify" if isinstance(notifier, InotifyNotifier) else "polling"
+        print(f"Watching {', '.join(self.directories)} ({mode}, {self.workers} workers). Press Ctrl+C to stop.")
+        
+        executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_watch_worker,
+                                       initargs=(EXTRACTION_TRACE_FILE, EXTRACTION_PROFILER, self.workers))
+        try:
+            # Files that arrived while the watcher was not running
+            self.scan()
+            while True:
+                self.submit_settled(executor)
+                # Come back sooner when files are waiting to settle
+                timeout = min(self.poll_interval, self.settle_seconds) if self.pending else self.poll_interval
+                changed = notifier.wait(timeout)
+                if changed is None:
+                    self.scan()
+                else:
+                    for path in changed:
+                        self.observe(path)
+        except KeyboardInterrupt:
+            print(f"\nStopping; waiting for {len(self.in_flight)} file(s) in progress...")
+        finally:
+            notifier.close()
+            executor.shutdown(wait=True)
+            print(f"Watcher stopped: {self.completed} file(s) extracted, {self.failed} failed")
+
+def warm_up_backends():
+    """Import the extraction backends and start the external tools they need, so the first file does not pay for it"""
+    for module_name in ("PyPDF2", "PIL.Image", "pytesseract", "requests", "numpy", "moviepy.editor"):
+        try:
+            importlib.import_module(module_name)
+        except ImportError:
+            pass
+    for warm_up in (installed_tesseract_languages, get_ffmpeg_binary, get_sarvam_client):
+        try:
+            warm_up()
+        except Exception as e:
+            print(f"Warning: Could not warm up {warm_up.__name__}: {e}")
+    if local_asr_available() and (TRANSCRIPTION_BACKEND == 'local' or (TRANSCRIPTION_BACKEND == 'auto' and not SARVAM_API_KEY)):
+        # Loading the Whisper model takes seconds, and every file will be transcribed locally
+        try:
+            get_local_asr_pipeline()
+        except Exception as e:
+            print(f"Warning: Could not load the local speech recognition model: {e}")
+    if TESSERACT_OCR_MODE == 'multilingual':
+        # Only the multilingual OCR chain falls back to Tika, whose JVM takes seconds to start
+        try:
+            get_tika_parser()
+        except Exception as e:
+            print(f"Warning: Could not start Tika: {e}")
+
+def _init_service_worker(trace_file, profiler, transcribing_processes=1):
+    """Set up a service worker process with its backends loaded"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _init_batch_worker(trace_file, profiler, transcribing_processes)
+    warm_up_backends()
+
+def _service_worker(file_path, file_type=None, use_cache=True):
+    """Extract one file inside a service worker process and return the result with its type"""
+    if not file_type:
+        with span("detect", file=file_path):
+            file_type = detect_file_type(file_path)
+    cache_hits = extraction_cache.hits
+    extraction_result = extract_text(file_path, file_type, use_cache=use_cache)
+    return dict(extraction_result, type=file_type, cached=extraction_cache.hits > cache_hits)
+
+class ExtractionService:
+    """Runs extractions for HTTP clients on a pool of warm worker processes
+    
+    At most `workers` files are extracted at once and up to `queue_size` more wait for a worker;
+    further requests are rejected straight away so callers can back off.
+    """
+    
+    def __init__(self, workers=None, queue_size=SERVICE_QUEUE_SIZE):
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.slots = threading.BoundedSemaphore(self.workers + queue_size)
+        self.lock = threading.Lock()
+        self.active = 0
+        self.completed = 0
+        self.rejected = 0
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_service_worker,
+                                            initargs=(EXTRACTION_TRACE_FILE, EXTRACTION_PROFILER, self.workers))
+        # Start every worker now rather than on the first requests
+        for future in [self.executor.submit(os.getpid) for _ in range(self.workers)]:
+            future.result()
+    
+    def reserve(self):
+        """Take a slot for one extraction; returns False, and counts the rejection, if the queue is full"""
+        if self.slots.acquire(blocking=False):
+            return True
+        with self.lock:
+            self.rejected += 1
+        return False
+    
+    def release(self):
+        """Give back a slot taken with reserve() that will not be used by extract()"""
+        self.slots.release()
+    
+    def extract(self, file_path, file_type=None, use_cache=True, reserved=False):
+        """Extract a file on the pool; returns None if the queue is full
+        
+        Pass reserved=True when the slot was already taken with reserve(); extract() gives it back either way.
+        """
+        if not reserved and not self.reserve():
+            return None
+        with self.lock:
+            self.active += 1
+        start = time.time()
+        try:
+            result = self.executor.submit(_service_worker, file_path, file_type, use_cache).result()
+        finally:
+            self.slots.release()
+            with self.lock:
+                self.active -= 1
+                self.completed += 1
+        result["elapsed"] = round(time.time() - start, 3)
+        return result
+    
+    def stats(self):
+        with self.lock:
+            return {"workers": self.workers, "queue_size": self.queue_size, "active": self.active,
+                    "completed": self.completed, "rejected": self.rejected}
+    
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+
+class ExtractionRequestHandler(BaseHTTPRequestHandler):
+    """HTTP API of the extraction service
+    
+    POST /extract with a JSON body {"path": ..., "type": optional, "use_cache": optional} extracts a local file;
+    POST /extract?filename=name.ext with the file as the raw request body extracts an upload.
+    Both return {"text", "method", "type", "cached", "elapsed"}. GET /health returns the pool's state.
+    """
+    
+    def do_GET(self):
+        if urllib.parse.urlsplit(self.path).path == "/health":
+            self._send_json(200, dict(self.server.service.stats(), status="ok"))
+        else:
+            self._send_json(404, {"error": "Not found"})
+    
+    def do_POST(self):
+        url = urllib.parse.urlsplit(self.path)
+        if url.path != "/extract":
+            self._send_json(404, {"error": "Not found"})
+            return
+        
+        # Bodies are read by length; chunked uploads are not supported
+        if self.headers.get('Content-Length') is None:
+            self.close_connection = True
+            self._send_json(411, {"error": "A Content-Length header is required"})
+            return
+        try:
+            length = int(self.headers['Content-Length'])
+            if length < 0:
+                raise ValueError(length)
+        except ValueError:
+            self.close_connection = True
+            self._send_json(400, {"error": "Invalid Content-Length header"})
+            return
+        content_type = self.headers.get('Content-Type', '').split(';')[0].strip()
+        if content_type == 'application/json':
+            try:
+                request = json.loads(self.rfile.read(length) or b'{}')
+                file_path = request["path"]
+            except (ValueError, KeyError, TypeError):
+                self._send_json(400, {"error": 'Expected a JSON body with a "path"'})
+                return
+            if not os.path.isfile(file_path):
+                self._send_json(404, {"error": f"File not found: {file_path}"})
+                return
+            self._extract(file_path, request.get("type"), request.get("use_cache", True))
+            return
+        
+        # Anything else is the uploaded file itself
+        if length > SERVICE_MAX_UPLOAD_BYTES:
+            self._send_json(413, {"error": f"Uploads are limited to {SERVICE_MAX_UPLOAD_BYTES // (1024 * 1024)} MB"})
+            return
+        # Claim a slot before reading the body so a full service does not spool uploads it will reject
+        service = self.server.service
+        if not service.reserve():
+            # The unread body would be taken for the next request, so the connection is closed instead
+            self.close_connection = True
+            self._send_busy()
+            return
+        query = urllib.parse.parse_qs(url.query)
+        file_name = os.path.basename(query.get("filename", ["upload"])[0]) or "upload"
+        with tempfile.TemporaryDirectory(prefix="extraction_upload_") as upload_dir:
+            file_path = os.path.join(upload_dir, file_name)
+            try:
+                with open(file_path, 'wb') as f:
+                    remaining = length
+                    while remaining:
+                        chunk = self.rfile.read(min(remaining, 1024 * 1024))
+                        if not chunk:
+                            break
+                        f.write(chunk)
+                        remaining -= len(chunk)
+            except BaseException:
+                service.release()
+                raise
+            if remaining:
+                # The client disconnected or sent less than it declared; do not extract a partial file
+                service.release()
+                self.close_connection = True
+                self._send_json(400, {"error": f"Upload ended after {length - remaining} of {length} bytes"})
+                return
+            self._extract(file_path, query.get("type", [None])[0], query.get("use_cache", ["1"])[0] not in ("0", "false"),
+                          reserved=True)
+    
+    def _extract(self, file_path, file_type, use_cache, reserved=False):
+        try:
+            result = self.server.service.extract(file_path, file_type, use_cache, reserved)
+        except Exception as e:
+            print(f"Error extracting {file_path}: {e}")
+            self._send_json(500, {"error": str(e)})
+            return
+        if result is None:
+            self._send_busy()
+        else:
+            self._send_json(200, result)
+    
+    def _send_busy(self):
+        self._send_json(503, {"error": "All workers are busy and the queue is full, try again later"}, retry_after=1)
+    
+    def _send_json(self, status, body, retry_after=None):
+        payload = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        if retry_after:
+            self.send_header('Retry-After', str(retry_after))
+        self.end_headers()
+        self.wfile.write(payload)
+    
+    def address_string(self):
+        # Unix socket clients have no address
+        return self.client_address[0] if self.client_address else "unix-socket"
+    
+    def log_message(self, format, *args):
+        print(f"[service] {self.address_string()} {format % args}")
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+def run_service(host=SERVICE_HOST, port=SERVICE_PORT, socket_path=None, workers=None, queue_size=SERVICE_QUEUE_SIZE):
+    """Serve extractions over HTTP on host:port, or on a Unix socket, until interrupted"""
+    print("Starting extraction workers...")
+    service = ExtractionService(workers, queue_size)
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        server = ThreadingUnixHTTPServer(socket_path, ExtractionRequestHandler)
+        where = f"unix socket {socket_path}"
+    else:
+        server = ThreadingHTTPServer((host, port), ExtractionRequestHandler)
+        server.daemon_threads = True
+        where = f"http://{host}:{server.server_address[1]}"
+    server.service = service
+    print(f"Extraction service listening on {where} ({service.workers} workers, queue of {queue_size}). Press Ctrl+C to stop.")
+    
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopping extraction service...")
+    finally:
+        server.server_close()
+        service.shutdown()
+        if socket_path and os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+def build_arg_parser():
+    """Build the command line interface; without a command the GUI is started"""
+    arg_parser = argparse.ArgumentParser(description="Multilingual Text Extractor")
+    subparsers = arg_parser.add_subparsers(dest="command")
+    
+    extract_parser = subparsers.add_parser("extract", help="Extract text from files without the GUI")
+    extract_parser.add_argument("sources", nargs="*", help="Files, directories or glob patterns to process")
+    extract_parser.add_argument("-m", "--manifest", help="File listing one input path per line (or a JSON list of paths)")
+    extract_parser.add_argument("-w", "--workers", type=int, default=None,
+                                help="Number of worker processes (default: number of CPU cores)")
+    extract_parser.add_argument("--no-save", action="store_true", help=f"Do not write results to {EXTRACTS_DIR}")
+    extract_parser.add_argument("--no-cache", action="store_true", help="Ignore cached results and extract every file again")
+    extract_parser.add_argument("--stream", action="store_true",
+                                help="Process files one at a time and print their text as each page or segment is extracted")
+    extract_parser.add_argument("--trace", metavar="FILE", help="Append per-stage timing spans to FILE as JSON lines")
+    extract_parser.add_argument("--profile", choices=["cprofile", "pyinstrument"],
+                                help=f"Profile each file's extraction and save the results in {PROFILES_DIR}")
+    
+    serve_parser = subparsers.add_parser("serve", help="Serve extractions over local HTTP from a pool of warm workers")
+    serve_parser.add_argument("--host", default=SERVICE_HOST, help=f"Address to listen on (default: {SERVICE_HOST})")
+    serve_parser.add_argument("--port", type=int, default=SERVICE_PORT, help=f"Port to listen on (default: {SERVICE_PORT})")
+    serve_parser.add_argument("--socket", metavar="PATH", help="Listen on a Unix socket instead of a TCP port")
+    serve_parser.add_argument("-w", "--workers", type=int, default=None,
+                              help="Number of worker processes (default: number of CPU cores)")
+    serve_parser.add_argument("--queue-size", type=int, default=SERVICE_QUEUE_SIZE,
+                              help=f"Requests that may wait for a worker before new ones get 503 (default: {SERVICE_QUEUE_SIZE})")
+    serve_parser.add_argument("--trace", metavar="FILE", help="Append per-stage timing spans to FILE as JSON lines")
+    
+    watch_parser = subparsers.add_parser("watch", help="Extract new files as they appear in one or more directories")
+    watch_parser.add_argument("directories", nargs="*", default=[WATCH_DIR], help=f"Directories to watch (default: {WATCH_DIR})")
+    watch_parser.add_argument("-w", "--workers", type=int, default=None,
+                              help="Number of worker processes (default: number of CPU cores)")
+    watch_parser.add_argument("--no-save", action="store_true", help=f"Do not write results to {EXTRACTS_DIR}")
+    watch_parser.add_argument("--no-cache", action="store_true", help="Ignore cached results and extract every file again")
+    watch_parser.add_argument("--settle", type=float, default=WATCH_SETTLE_SECONDS,
+                              help="Seconds a file must stay unchanged before it is extracted")
+    watch_parser.add_argument("--interval", type=float, default=WATCH_POLL_INTERVAL, help="Seconds between checks")
+    watch_parser.add_argument("--poll", action="store_true", help="Poll the directories instead of using inotify")
+    watch_parser.add_argument("--trace", metavar="FILE", help="Append per-stage timing spans to FILE as JSON lines")
+    
+    return arg_parser
+
+def main(argv=None):
+    global EXTRACTION_TRACE_FILE, EXTRACTION_PROFILER
+    args = build_arg_parser().parse_args(argv)
+    
+    if args.command == "extract":
+        if args.trace:
+            EXTRACTION_TRACE_FILE = os.path.abspath(args.trace)
+        if args.profile:
+            EXTRACTION_PROFILER = args.profile
+        file_paths = collect_input_files(args.sources, args.manifest)
+        if args.stream:
+            if not file_paths:
+                print("No input files found.")
+            results = run_streaming(file_paths, save=not args.no_save, use_cache=not args.no_cache)
+        else:
+            results = run_batch(file_paths, workers=args.workers, save=not args.no_save, use_cache=not args.no_cache)
+        return 0 if results and all(result["ok"] for result in results) else 1
+    
+    if args.command == "serve":
+        if args.trace:
+            EXTRACTION_TRACE_FILE = os.path.abspath(args.trace)
+        run_service(args.host, args.port, args.socket, args.workers, args.queue_size)
+        return 0
+    
+    if args.command == "watch":
+        if args.trace:
+            EXTRACTION_TRACE_FILE = os.path.abspath(args.trace)
+        watcher = DirectoryWatcher(args.directories, workers=args.workers, save=not args.no_save, use_cache=not args.no_cache,
+                                   settle_seconds=args.settle, poll_interval=args.interval, use_inotify=not args.poll)
+        watcher.run()
+        return 0
+    
+    check_backends()
     create_gui()
+    return 0
 
 def get_audio_duration(file_path):
     """Get the duration of an audio file in seconds."""
     try:
-        audio_clip = AudioFileClip(file_path)
-        duration = audio_clip.duration
-        audio_clip.close()
+        # Read the duration from the container header without starting a decoder
+        from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+        with span("probe"):
+            duration = ffmpeg_parse_infos(file_path).get('duration')
+        if not duration:
+            raise ValueError("no duration in the file header")
         return duration
     except Exception as e:
         print(f"Error determining audio duration: {str(e)}")
@@ -758,4 +4281,4 @@ def get_audio_duration(file_path):
         return 31
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
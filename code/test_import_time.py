@@ -0,0 +1,38 @@
+import os
+import sys
+import subprocess
+import tempfile
+
+from benchmark import LAZY_MODULES, DEFAULT_IMPORT_BUDGET
+
+# Guards the lazy imports of model.py: importing it must stay fast and must not load the GUI,
+# PDF, Tika or video libraries, which the CLI, the batch workers and the service import it for.
+#
+#   python -m pytest code/test_import_time.py
+#   IMPORT_BUDGET=0.5 python code/test_import_time.py
+
+IMPORT_BUDGET = float(os.environ.get('IMPORT_BUDGET', DEFAULT_IMPORT_BUDGET))
+
+def import_model_with_importtime():
+    """Import model in a fresh interpreter with -X importtime; returns {module: cumulative seconds}"""
+    code_dir = os.path.dirname(os.path.abspath(__file__))
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import model'], cwd=tempfile.gettempdir(),
+                             env=dict(os.environ, PYTHONPATH=code_dir), capture_output=True, text=True, check=True)
+    # Lines look like "import time:       self [us] |  cumulative | imported package"
+    modules = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or line.endswith("imported package"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = int(cumulative) / 1e6
+    return modules
+
+def test_import_model():
+    modules = import_model_with_importtime()
+    loaded = sorted({name for name in modules if name.split(".")[0] in LAZY_MODULES})
+    assert not loaded, f"import model loaded {', '.join(loaded)}"
+    assert modules["model"] <= IMPORT_BUDGET, f"import model took {modules['model']:.3f}s, over the {IMPORT_BUDGET:.3f}s budget"
+
+if __name__ == "__main__":
+    test_import_model()
+    print("OK")